@@ -0,0 +1,35 @@
+from tratamento_dados import COLUNAS_INDICADORES  # Indicadores usados nas matrizes de correlação e nos recortes
+
+# Função para contar alunos por PEDRA e ANO (gráfico de barras)
+def contagem_pedra_ano(df):
+    return df.groupby(['PEDRA', 'ANO'], observed=True).size().reset_index(name='count')
+
+# Função para calcular a porcentagem de alunos de cada PEDRA dentro do ano (gráfico de linha)
+def porcentagem_pedra_por_ano(df):
+    df_grouped = df.groupby(['ANO', 'PEDRA'], observed=True).size().reset_index(name='Quantidade')
+    df_grouped['Porcentagem'] = df_grouped['Quantidade'] / df_grouped.groupby('ANO', observed=True)['Quantidade'].transform('sum') * 100
+    return df_grouped
+
+# Função para calcular a matriz de correlação dos indicadores com uma variável alvo Sim/Não
+def matriz_correlacao_alvo(df, coluna_alvo):
+    df_alvo = df[df[coluna_alvo].notna()]
+    df_numerico = df_alvo[COLUNAS_INDICADORES].assign(**{f'{coluna_alvo}_NUM': df_alvo[coluna_alvo].map({'Sim': 1, 'Não': 0})})
+    return df_numerico.astype('float64').corr()
+
+# Função para resumir os indicadores (quantidade de alunos e médias) por uma dimensão
+def recorte_por(df, coluna):
+    recorte = df.groupby(coluna, observed=True)[COLUNAS_INDICADORES].mean()
+    recorte.insert(0, 'ALUNOS', df.groupby(coluna, observed=True).size())
+    return recorte.reset_index()
+
+# Função para materializar todas as agregações da página de Análises de uma só vez
+def calcular_agregacoes(df):
+    return {
+        'contagem_pedra_ano': contagem_pedra_ano(df),
+        'porcentagem_pedra_ano': porcentagem_pedra_por_ano(df),
+        'correlacao_ponto_virada': matriz_correlacao_alvo(df, 'PONTO_VIRADA'),
+        'correlacao_indicado_bolsa': matriz_correlacao_alvo(df, 'INDICADO_BOLSA'),
+        'por_ano': recorte_por(df, 'ANO'),
+        'por_fase': recorte_por(df, 'FASE'),
+        'por_pedra': recorte_por(df, 'PEDRA'),
+    }
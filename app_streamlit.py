@@ -1,88 +1,12 @@
+import os
+import sys
 import streamlit as st 
-import pandas as pd
-import plotly.graph_objects as go
-from joblib import load
-import plotly.express as px
-import numpy as np
-
-#Funções de leitura
-import pandas as pd
-
-# Função para tratar as colunas de diferentes anos
-def tratativa_base_passos_magicos(df, year_list):
-    combined_df = pd.DataFrame()
-
-    for year in year_list:
-        # Filtra as colunas que terminam com o ano especificado
-        cols_with_year = [col for col in df.columns if col.endswith(f'_{year}')]
-
-        # Cria novas colunas sem o ano
-        new_columns = ['NOME', 'ANO'] + [col[:-5] for col in cols_with_year]
-
-        # Cria um novo DataFrame temporário
-        temp_df = pd.DataFrame(columns=new_columns)
-
-        # Preenche o novo DataFrame com os dados correspondentes
-        for index, row in df.iterrows():
-            new_row = [row['NOME'], year] + [row[col] for col in cols_with_year]
-            temp_df.loc[index] = new_row
-
-        # Adiciona os dados processados ao DataFrame combinado
-        combined_df = pd.concat([combined_df, temp_df], ignore_index=True)
-
-    return combined_df
-
-# Função para tratar a coluna FASE_TURMA para o ano de 2020
-def tratar_fase_turma(df):
-    df.loc[df['ANO'] == '2020', 'FASE'] = df['FASE_TURMA'].str[0]
-    df.loc[df['ANO'] == '2020', 'TURMA'] = df['FASE_TURMA'].str[1:]
-    return df
-
-# Função para limpar o dataset removendo linhas e colunas indesejadas
-def cleaning_dataset(df):
-    _df = df.dropna(subset=df.columns.difference(['NOME', 'ANO']), how='all')  # Drop linhas com NaN em todas as colunas exceto 'NOME' e 'ANO'
-    _df = _df[~_df.isna().all(axis=1)]  # Remove linhas com apenas NaN
-    return _df
-
-# Função para manter apenas as colunas sem valores nulos
-def drop_null_columns(df):
-    df = df.dropna(axis=1, how='any')  # Drop colunas com qualquer valor nulo
-    return df
-
-# Função para restaurar colunas específicas de outro DataFrame
-def restore_columns(df, df_source, columns):
-    for col in columns:
-        df.loc[:, col] = df_source[col]
-    return df
-
-# Função para arredondar as colunas para 2 casas decimais
-def round_columns(df, columns):
-    df[columns] = df[columns].apply(pd.to_numeric, errors='coerce')
-    df[columns] = df[columns].round(2)
-    return df
-
-# Função para filtrar valores indesejados em uma coluna específica
-def filter_unwanted_values(df, column, unwanted_values):
-    df = df[~df[column].isin(unwanted_values)]
-    return df
-
-# Pipeline para executar todas as funções
-def pipeline_passos_magicos(df, year_list, colunas_para_arredondar, valores_indesejados):
-    df_combined = tratativa_base_passos_magicos(df, year_list)
-    df_combined = tratar_fase_turma(df_combined)
-    df_cleaned = cleaning_dataset(df_combined)
-    df_cleaned = drop_null_columns(df_cleaned)
-    
-    # Restaurar colunas
-    df_cleaned = restore_columns(df_cleaned, df_combined, ['PONTO_VIRADA', 'INDICADO_BOLSA'])
-    
-    # Arredondar colunas numéricas
-    df_cleaned = round_columns(df_cleaned, colunas_para_arredondar)
-    
-    # Filtrar valores indesejados na coluna 'PEDRA'
-    df_final = filter_unwanted_values(df_cleaned, 'PEDRA', valores_indesejados)
-    
-    return df_final
+import time
+
+# Apenas o necessário para a sidebar é importado aqui: cada página importa as bibliotecas que usa
+# (pandas, plotly, base tratada e modelos), para que um worker novo renderize a primeira página mais rápido
+from perfilamento import PERFILAMENTO_ATIVO, registros_perfilamento
+from unidades import falhas_preaquecimento, fonte_base, iniciar_preaquecimento, listar_unidades, registrar_uso
 
 # Configurações Gerais da Página
 st.set_page_config(page_title="Tech Challenge - Passos Mágicos & FIAP - Grupo 119", layout="wide")
@@ -125,19 +49,97 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Sidebar para navegação
-page = st.sidebar.selectbox("Escolha a Página", ["Análises", "Deploy do Modelo"])
+page = st.sidebar.selectbox("Escolha a Página", ["Análises", "Trajetória do Aluno", "Deploy do Modelo"], key="pagina")
+
+# Unidade (base e modelos) exibida na sessão
+unidades = {unidade['nome']: unidade for unidade in listar_unidades()}
+nome_unidade = st.sidebar.selectbox("Unidade", list(unidades), key="unidade")
+unidade = unidades[nome_unidade]
 
-# Carregar os dados
-df_passos_magicos = pd.read_csv(r'PEDE_PASSOS_DATASET_FIAP.csv', sep=';')
-year_list = ['2020', '2021', '2022']
+# Conta um acesso por sessão e unidade (as mais acessadas são pré-aquecidas quando um processo novo sobe)
+if st.session_state.get('unidade_registrada') != nome_unidade:
+    registrar_uso(nome_unidade)
+    st.session_state['unidade_registrada'] = nome_unidade
+
+# Parâmetros da base de dados
+caminho_base, year_list = fonte_base(unidade)  # year_list é None em uma base incremental (anos do manifesto)
 colunas_para_arredondar = ['INDE', 'IAA', 'IEG', 'IPS', 'IDA', 'IPP', 'IPV', 'IAN']
 valores_indesejados = ['#NULO!', 'D9891/2A']
 
-# Executar o pipeline completo
-df_pm_not_nulls = pipeline_passos_magicos(df_passos_magicos, year_list, colunas_para_arredondar, valores_indesejados)
+# Forçar o reprocessamento da base (ex.: após atualizar o arquivo)
+if st.sidebar.button("Recarregar dados"):
+    from cache_dados import invalidar_cache
+
+    invalidar_cache(caminho_base)
+
+# Função para descrever o erro ao carregar a base da unidade (arquivo ausente, coluna obrigatória ausente ou fora do esquema)
+def mensagem_erro_base(erro):
+    motivo = f"coluna obrigatória ausente: {erro}" if isinstance(erro, KeyError) else str(erro)
+    anos = f"anos {', '.join(year_list)}" if year_list else "base incremental"
+    return f"⚠️ Não foi possível carregar a base da unidade {nome_unidade} ({caminho_base}, {anos}): {motivo}"
+
+# Função para exibir na sidebar o uso dos caches compartilhados pelas unidades (apenas do que já foi carregado neste
+# processo: consultar cache_dados sem que ele tenha sido importado carregaria pandas e pyarrow na página "Deploy do Modelo")
+# e iniciar o pré-aquecimento das unidades mais acessadas (com PASSOS_MAGICOS_PREAQUECER > 0). Chamada ao final do script
+# (ou antes de interrompê-lo), depois da página renderizada, para não atrasar a primeira renderização do processo
+def finalizar_pagina():
+    with st.sidebar.expander("Cache de dados"):
+        if 'cache_dados' in sys.modules:
+            entradas_cache, estatisticas_cache = sys.modules['cache_dados'].info_cache()
+            st.caption(f"Bases: {estatisticas_cache['memoria_mb']:.1f} MiB de {estatisticas_cache['orcamento_mb']:.0f} MiB, "
+                       f"{estatisticas_cache['acertos']} acertos, {estatisticas_cache['faltas']} faltas, "
+                       f"{estatisticas_cache['descartes']} descartes")
+            # Memória por unidade (entradas de arquivos fora do registro aparecem pelo caminho)
+            nomes_por_arquivo = {os.path.abspath(fonte_base(dados)[0]): nome for nome, dados in unidades.items()}
+            memoria_unidades = {}
+            for entrada in entradas_cache:
+                nome = nomes_por_arquivo.get(entrada['arquivo'], entrada['arquivo'])
+                memoria_unidades[nome] = memoria_unidades.get(nome, 0) + entrada['memoria_mb']
+            for nome, memoria in memoria_unidades.items():
+                st.markdown(f"**{nome}**: {memoria:.1f} MiB")
+        else:
+            st.caption("Nenhuma base carregada neste processo.")
+        if 'modelos' in sys.modules:
+            estatisticas_modelos = sys.modules['modelos'].estatisticas_modelos()
+            st.caption(f"Modelos: {estatisticas_modelos['entradas']} carregados, {estatisticas_modelos['memoria_mb']:.2f} MiB "
+                       f"de {estatisticas_modelos['orcamento_mb']:.0f} MiB, {estatisticas_modelos['descartes']} descartes")
+        for nome, erro in falhas_preaquecimento().items():
+            st.warning(f"Falha no pré-aquecimento de {nome}: {erro}")
+
+    iniciar_preaquecimento()
+
+# Resultados obtidos no notebook de análise, exibidos enquanto o treino (treino_modelos.py) não for executado
+RESULTADOS_NOTEBOOK = {
+    'ponto_virada': {
+        'KNN': {'acuracia_teste': 0.9111, 'cv_acuracia_media': 0.923, 'cv_acuracia_desvio': 0.0158},
+        'Random Forest': {'acuracia_teste': 0.9622, 'cv_acuracia_media': 0.9497, 'cv_acuracia_desvio': 0.0215},
+        'SVM': {'acuracia_teste': 0.9422, 'cv_acuracia_media': 0.9501, 'cv_acuracia_desvio': 0.0216},
+    },
+    'bolsa': {
+        'KNN': {'acuracia_teste': 0.7803, 'precisao_teste': 0.7872},
+        'Random Forest': {'acuracia_teste': 0.7687, 'precisao_teste': 0.7971},
+        'SVM': {'acuracia_teste': 0.7572, 'precisao_teste': 0.8526},
+    },
+}
 
 # Página de Análises
 if page == "Análises":
+    import numpy as np
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    from cache_dados import carregar_agregacoes
+    from modelos import ler_relatorio
+
+    # Carregar as agregações da base tratada (calculadas uma única vez por versão da base)
+    try:
+        with st.spinner('Processando a base de dados...'):
+            agregacoes = carregar_agregacoes(caminho_base, year_list, colunas_para_arredondar, valores_indesejados)
+    except (OSError, KeyError, ValueError) as erro:
+        st.error(mensagem_erro_base(erro))
+        finalizar_pagina()
+        st.stop()
+
     ## BLOCO 1 - INTRODUÇÃO
     st.write('# I. Introdução')
     st.markdown('<div class="custom-hr"></div>', unsafe_allow_html=True)
@@ -188,8 +190,8 @@ if page == "Análises":
     Dito isso, vamos analisar a distribuição de alunos em cada Pedra-Conceito por ano
                 """)
 
-  # Agrupar por 'PEDRA' e 'ANO' e contar o número de 'NOME'
-    df_grouped = df_pm_not_nulls.groupby(['PEDRA', 'ANO']).size().reset_index(name='count')
+  # Contagem de alunos por 'PEDRA' e 'ANO'
+    df_grouped = agregacoes['contagem_pedra_ano']
 
     # Mapear as cores para tons pastéis válidos
     color_map = {
@@ -237,8 +239,7 @@ if page == "Análises":
     Além disso, plotamos a evolução das pedras ao longo dos anos para facilitar o entendimento
                 """)
 
-    df_grouped = df_pm_not_nulls.groupby(['ANO', 'PEDRA']).size().reset_index(name='Quantidade')
-    df_grouped['Porcentagem'] = df_grouped['Quantidade'] / df_grouped.groupby('ANO')['Quantidade'].transform('sum') * 100
+    df_grouped = agregacoes['porcentagem_pedra_ano']
     # Criando o gráfico de linha para mostrar a evolução da quantidade de alunos por pedra ao longo dos anos
     fig = px.line(df_grouped, 
               x='ANO', 
@@ -278,6 +279,13 @@ if page == "Análises":
     # Exibir o gráfico no Streamlit
     st.plotly_chart(fig, use_container_width=True)
 
+    # Médias dos indicadores por Ano, Fase e Pedra
+    with st.expander("Médias dos indicadores por Ano, Fase e Pedra"):
+        aba_ano, aba_fase, aba_pedra = st.tabs(["Ano", "Fase", "Pedra"])
+        aba_ano.dataframe(agregacoes['por_ano'].round(2), hide_index=True)
+        aba_fase.dataframe(agregacoes['por_fase'].round(2), hide_index=True)
+        aba_pedra.dataframe(agregacoes['por_pedra'].round(2), hide_index=True)
+
     st.markdown('<div class="custom-hr"></div>', unsafe_allow_html=True)
     st.write('# III. Construindo os Modelos')
     st.markdown("""
@@ -288,12 +296,7 @@ if page == "Análises":
     st.markdown("""
     Para este primeiro modelo, utilizamos a base de dados para identificar quais dos indicadores mencionados acima apresentam maior correlação com o Ponto de Virada.""")
 
-    #Ajustando os dados
-    df_ponto_virada = df_pm_not_nulls[df_pm_not_nulls['PONTO_VIRADA'].isnull() == False]
-    df_ponto_virada['PONTO_VIRADA_NUM'] = df_ponto_virada['PONTO_VIRADA'].map({'Sim': 1, 'Não': 0})
-    colunas_numericas = ['INDE', 'IAA', 'IEG', 'IPS', 'IDA', 'IPP', 'IPV', 'IAN', 'PONTO_VIRADA_NUM']
-    df_numerico_pv = df_ponto_virada[colunas_numericas]
-    matriz_correlacao = df_numerico_pv.corr()
+    matriz_correlacao = agregacoes['correlacao_ponto_virada']
 
     # Criando o heatmap com Plotly
     fig = go.Figure(data=go.Heatmap(
@@ -322,20 +325,29 @@ if page == "Análises":
     Embora alguns indicadores apresentem uma correlação maior com a nossa variável de saída, decidimos utilizar todos os indicadores como features independentes, uma vez que todas as correlações são positivas. A validação será feita com base na acurácia.
                 """)
 
+    # Métricas do último treino, se disponível
+    relatorio_modelos = ler_relatorio()
+    if relatorio_modelos is not None:
+        st.caption(f"Métricas do treino executado em {relatorio_modelos['gerado_em']} (treino_modelos.py)")
+        resultados_pv = relatorio_modelos['tarefas']['ponto_virada']['modelos']
+        resultados_bolsa = relatorio_modelos['tarefas']['bolsa']['modelos']
+    else:
+        resultados_pv = RESULTADOS_NOTEBOOK['ponto_virada']
+        resultados_bolsa = RESULTADOS_NOTEBOOK['bolsa']
+
     st.write('#### Resultados de acurácia encontrados:')
-    st.write("###### **- KNN**: 91.11%")
-    st.write("###### **- Random Forest**: 96.22%")
-    st.write("###### **- SVM**: 94.22%")
+    for nome, resultado in resultados_pv.items():
+        st.write(f"###### **- {nome}**: {resultado['acuracia_teste']:.2%}")
 
     st.markdown("""
     Como a acurácia dos modelos foi bastante alta, decidimos verificar a possibilidade de overfitting. Para isso, realizamos uma validação cruzada com 5 grupos diferentes dentro do mesmo dataset, medindo a média e o desvio padrão da acurácia""")
     
     st.write('#### Fazendo a validação cruzada, temos:')
-    st.markdown("""
+    itens_cv = ''.join(f"<li><strong>{nome}</strong> - média acurácia: {resultado['cv_acuracia_media']:.2%}, desvio padrão: {resultado['cv_acuracia_desvio']:.2%}</li>"
+                       for nome, resultado in resultados_pv.items())
+    st.markdown(f"""
     <ul style="list-style-type: disc;">
-        <li><strong>KNN</strong> - média acurácia: 92.3%, desvio padrão: 1.58% </li>
-        <li><strong>Random Forest</strong> - média acurácia: 94.97%, desvio padrão: 2.15%</li>
-        <li><strong>SVM</strong> - média acurácia: 95.01%, desvio padrão: 2.16%</li>
+        {itens_cv}
     </ul>
     """, unsafe_allow_html=True)
     
@@ -347,11 +359,7 @@ if page == "Análises":
     st.markdown("""
     Para o próximo modelo, também utilizamos a base de dados para identificar quais dos indicadores mencionados acima apresentam maior correlação com o Ponto de Virada.""")
 
-    df_indicado_bolsa = df_pm_not_nulls[df_pm_not_nulls['INDICADO_BOLSA'].isnull() == False]
-    df_indicado_bolsa['INDICADO_BOLSA_NUM'] = df_indicado_bolsa['INDICADO_BOLSA'].map({'Sim': 1, 'Não': 0})
-    colunas_numericas = ['INDE', 'IAA', 'IEG', 'IPS', 'IDA', 'IPP', 'IPV', 'IAN', 'INDICADO_BOLSA_NUM']
-    df_numerico = df_indicado_bolsa[colunas_numericas]
-    matriz_correlacao = df_numerico.corr()
+    matriz_correlacao = agregacoes['correlacao_indicado_bolsa']
 
     # Criando o heatmap com Plotly
     fig = go.Figure(data=go.Heatmap(
@@ -381,11 +389,11 @@ if page == "Análises":
                 """)
     
     st.write('#### Resultados de acurácia e precisão encontrados:')
-    st.markdown("""
+    itens_bolsa = ''.join(f"<li><strong>{nome}</strong> - acurácia: {resultado['acuracia_teste']:.2%}, precisão: {resultado['precisao_teste']:.2%}</li>"
+                          for nome, resultado in resultados_bolsa.items())
+    st.markdown(f"""
     <ul style="list-style-type: disc;">
-        <li><strong>KNN</strong> - acurácia: 78.03%, precisão: 78.72% </li>
-        <li><strong>Random Forest</strong> - acurácia: 76.87%, precisão: 79.71%</li>
-        <li><strong>SVM</strong> - acurácia: 75.72%, precisão: 85.26%</li>
+        {itens_bolsa}
     </ul>
     """, unsafe_allow_html=True)
 
@@ -400,28 +408,74 @@ if page == "Análises":
 """, unsafe_allow_html=True)
 
 
+# Página de Trajetória do Aluno
+elif page == "Trajetória do Aluno":
+    import plotly.express as px
+
+    from cache_dados import carregar_indice_alunos
+
+    # Índice por aluno (construído uma única vez por versão da base)
+    try:
+        with st.spinner('Processando a base de dados...'):
+            indice = carregar_indice_alunos(caminho_base, year_list, colunas_para_arredondar, valores_indesejados)
+    except (OSError, KeyError, ValueError) as erro:
+        st.error(mensagem_erro_base(erro))
+        finalizar_pagina()
+        st.stop()
+
+    st.write('### Trajetória do Aluno')
+    st.markdown('<div class="custom-hr"></div>', unsafe_allow_html=True)
+
+    prefixo = st.text_input("Buscar aluno pelo nome", placeholder="ALUNO-123")
+    nomes = indice.buscar_nomes(prefixo.strip()) if prefixo.strip() else []
+    if prefixo.strip() and not nomes:
+        st.warning("⚠️ Nenhum aluno encontrado")
+    elif nomes:
+        nome = st.selectbox("Aluno", nomes)
+        trajetoria = indice.trajetoria(nome).assign(ANO=lambda df: df['ANO'].astype(str))
+
+        # Cartões com a Pedra-Conceito de cada ano
+        colunas_cards = st.columns(len(trajetoria))
+        for coluna_card, (_, linha) in zip(colunas_cards, trajetoria.iterrows()):
+            with coluna_card:
+                st.markdown(f"""
+                <div class="custom-card">
+                    <div class="value">{linha['PEDRA']}</div>
+                    <div class="label">{linha['ANO']} - Fase {linha['FASE']}{linha['TURMA']} - INDE {linha['INDE']:.2f}</div>
+                </div>
+                """, unsafe_allow_html=True)
+
+        # Evolução dos indicadores ao longo dos anos
+        df_indicadores = trajetoria.melt(id_vars='ANO', value_vars=colunas_para_arredondar,
+                                         var_name='Indicador', value_name='Valor')
+        fig = px.line(df_indicadores, x='ANO', y='Valor', color='Indicador', markers=True,
+                      title=f'Evolução dos indicadores - {nome}')
+        fig.update_layout(xaxis_title='Ano', yaxis_title='Valor', yaxis_range=[0, 10.5])
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.dataframe(trajetoria, hide_index=True)
+
+        # Colegas da mesma turma no ano mais recente do aluno
+        ultimo = trajetoria.iloc[-1]
+        with st.expander(f"Turma {ultimo['FASE']}{ultimo['TURMA']} em {ultimo['ANO']}"):
+            st.dataframe(indice.alunos_da_turma(ultimo['ANO'], ultimo['FASE'], ultimo['TURMA']), hide_index=True)
+
 # Página de Deploy do Modelo
 elif page == "Deploy do Modelo":
+    from modelos import info_modelos, obter_modelo, obter_preditor, obter_tabela
+    from unidades import nomes_modelos
+
+    # Modelos da unidade selecionada
+    modelos_unidade = nomes_modelos(unidade)
+    modelo_pv, modelo_bolsa = modelos_unidade['ponto_virada'], modelos_unidade['bolsa']
 
     st.write('### Fazer a previsão do Ponto de Virada')
 
-    # Carregar o modelo treinado
-    modelo = load('modelo_svm_pv.joblib')
     def fazer_previsao(inde, iaa, ieg, ips, ida, ipp, ipv, ian):
-        # Cria um dataframe com as features
-        dados = pd.DataFrame({
-                    'INDE': [inde], 
-                    'IAA': [iaa],
-                    'IEG': [ieg],
-                    'IPS': [ips],
-                    'IDA': [ida],
-                    'IPP': [ipp],
-                    'IPV': [ipv],
-                    'IAN': [ian]
-                })
-        # Faz a previsão
-        previsao = modelo.predict(dados)
-        return previsao[0]
+        # Features na ordem do treino (INDE, IAA, IEG, IPS, IDA, IPP, IPV, IAN)
+        dados = [inde, iaa, ieg, ips, ida, ipp, ipv, ian]
+        # Faz a previsão com o preditor do registro (NumPy, ou o modelo do sklearn se ele não puder ser exportado)
+        return obter_preditor(modelo_pv).prever(dados)
     
     st.markdown("""
     <style>
@@ -490,17 +544,11 @@ elif page == "Deploy do Modelo":
 
     st.markdown('<div class="custom-hr"></div>', unsafe_allow_html=True)
     st.write('### Fazer a previsão do Indicativo de Bolsa')
-    # Carregar o modelo treinado
-    modelo = load('modelo_svm_b.joblib')
     def fazer_previsao_bolsa(ipp, ipv):
-        # Cria um dataframe com as features
-        dados = pd.DataFrame({
-                    'IPV': [ipv],
-                    'IPP': [ipp]
-                })
-        # Faz a previsão
-        previsao = modelo.predict(dados)
-        return previsao[0]
+        # Features na ordem do treino (IPV, IPP)
+        dados = [ipv, ipp]
+        # Consulta a previsão na tabela pré-calculada sobre a grade IPV x IPP (montada uma única vez por versão do modelo)
+        return obter_tabela(modelo_bolsa).prever(dados)
     
     col1, col2 = st.columns(2)
 
@@ -516,4 +564,91 @@ elif page == "Deploy do Modelo":
         if resultado == 0:
             st.warning("⚠️ Aluno ainda não recomendado para indicação de bolsa")
         else:
-            st.success("🎉 O aluno está pronto para ser indicado para um bolsa!")
\ No newline at end of file
+            st.success("🎉 O aluno está pronto para ser indicado para um bolsa!")
+
+    # Superfície de decisão do modelo (plotly só é importado quando o gráfico é exibido)
+    if st.toggle("Mostrar superfície de decisão do modelo de bolsa"):
+        import plotly.graph_objects as go
+
+        from tabela_previsao import TabelaPrevisao, eixo_grade
+
+        tabela_bolsa = obter_tabela(modelo_bolsa)
+        if not isinstance(tabela_bolsa, TabelaPrevisao):
+            st.info("ℹ️ A superfície de decisão só está disponível para modelos binários de até 2 indicadores.")
+        else:
+            eixo = eixo_grade()
+            fig = go.Figure(data=go.Heatmap(
+                z=tabela_bolsa.superficie(),  # Linhas = IPV, colunas = IPP
+                x=eixo,
+                y=eixo,
+                colorscale=[[0, 'lightgray'], [0.5, 'lightgray'], [0.5, 'orange'], [1, 'orange']],
+                zmin=0,
+                zmax=1,
+                colorbar=dict(tickvals=[0.25, 0.75], ticktext=['Não indicado', 'Indicado']),
+                hovertemplate='IPP %{x:.1f}<br>IPV %{y:.1f}<extra></extra>',
+            ))
+            # Entrada atual do formulário
+            fig.add_trace(go.Scatter(x=[ipp_input], y=[ipv_input], mode='markers', name='Aluno',
+                                     marker=dict(color='black', size=12, symbol='x')))
+            fig.update_layout(
+                title='Indicação de bolsa prevista para cada combinação de IPP e IPV',
+                xaxis_title='IPP',
+                yaxis_title='IPV',
+                width=600,
+                height=550,
+            )
+            st.plotly_chart(fig)
+
+    st.markdown('<div class="custom-hr"></div>', unsafe_allow_html=True)
+    st.write('### Fazer a previsão em lote')
+
+    # Upload de um CSV com os indicadores de vários alunos
+    arquivo_lote = st.file_uploader("Envie um CSV com as colunas INDE, IAA, IEG, IPS, IDA, IPP, IPV e IAN", type=['csv'])
+    if arquivo_lote is not None:
+        import pandas as pd
+
+        from previsao_lote import detectar_separador, prever_em_blocos
+
+        try:
+            sep = detectar_separador(arquivo_lote.getvalue().split(b'\n', 1)[0].decode('utf-8'))
+            df_lote = pd.read_csv(arquivo_lote, sep=sep)
+            inicio = time.perf_counter()
+            df_previsto = pd.concat(prever_em_blocos(df_lote, obter_modelo(modelo_pv), obter_tabela(modelo_bolsa)))
+            tempo = time.perf_counter() - inicio
+        except UnicodeDecodeError:
+            st.error("⚠️ O arquivo não está em UTF-8: salve o CSV com a codificação UTF-8 e envie novamente.")
+        except pd.errors.EmptyDataError:
+            st.error("⚠️ O arquivo está vazio.")
+        except ValueError as erro:
+            st.error(f"⚠️ {erro}")
+        else:
+            st.success(f"🎉 {len(df_previsto)} alunos processados em {tempo:.2f} s ({len(df_previsto) / tempo:.0f} alunos/s)")
+            st.dataframe(df_previsto.head(100))
+            st.download_button('Baixar previsões', df_previsto.to_csv(sep=sep, index=False).encode('utf-8'),
+                               file_name='previsoes.csv', mime='text/csv')
+
+    # Informações dos modelos carregados no processo (em texto: st.dataframe importaria pandas e pyarrow)
+    with st.expander("Modelos carregados"):
+        for modelo in info_modelos():
+            st.markdown(f"**{modelo['nome']}** ({modelo['tipo']}): `{modelo['caminho']}`, carregado em "
+                        f"{modelo['tempo_carga_s']:.3f} s, {modelo['memoria_mb']:.3f} MiB")
+
+# Painel de diagnóstico do pipeline na sidebar (apenas com PASSOS_MAGICOS_PERFILAMENTO=1)
+if PERFILAMENTO_ATIVO:
+    import pandas as pd
+
+    with st.sidebar.expander("Diagnóstico do pipeline"):
+        df_trace = pd.DataFrame(registros_perfilamento())
+        if df_trace.empty:
+            st.caption("Nenhuma execução do pipeline neste processo (base carregada do cache ou do snapshot).")
+        else:
+            st.dataframe(df_trace[['execucao', 'etapa', 'tempo_s', 'pico_memoria_mb', 'linhas_saida', 'colunas_saida']],
+                         hide_index=True)
+            st.download_button('Baixar trace (CSV)', df_trace.to_csv(index=False).encode('utf-8'),
+                               file_name='trace_pipeline.csv', mime='text/csv')
+            st.download_button('Baixar trace (JSON)', df_trace.to_json(orient='records', indent=2).encode('utf-8'),
+                               file_name='trace_pipeline.json', mime='application/json')
+
+
+# Painel "Cache de dados" e pré-aquecimento, depois da página renderizada
+finalizar_pagina()
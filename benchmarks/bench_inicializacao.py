@@ -0,0 +1,97 @@
+# Benchmark de inicialização a frio do app: tempo de import e tempo até a primeira renderização de cada página
+#
+# Cada página é renderizada em um processo novo (como um worker recém-criado), com -X importtime
+# para medir apenas os imports feitos durante a execução do script. Cada página é medida na configuração
+# padrão e com o pré-aquecimento das unidades ligado (PASSOS_MAGICOS_PREAQUECER).
+# Uso: python -m benchmarks.bench_inicializacao --repeticoes 3
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CAMINHO_APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app_streamlit.py')
+PAGINAS = ['Análises', 'Trajetória do Aluno', 'Deploy do Modelo']
+MARCADOR = 'inicio-execucao-app'
+
+# Configurações medidas: a padrão e com o pré-aquecimento das unidades ligado (unidades.py)
+CONFIGURACOES = {
+    'padrão': {},
+    'pré-aquecimento': {'PASSOS_MAGICOS_PREAQUECER': '2'},
+}
+
+# Bibliotecas pesadas acompanhadas no relatório
+BIBLIOTECAS = ['pandas', 'pyarrow', 'plotly.express', 'sklearn', 'joblib']
+
+# Função executada no processo filho: renderiza a página uma vez e informa o tempo e os módulos importados
+def renderizar_no_filho(pagina):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(CAMINHO_APP, default_timeout=300)
+    app.session_state['pagina'] = pagina
+    antes = set(sys.modules)
+    print(MARCADOR, file=sys.stderr, flush=True)
+    inicio = time.perf_counter()
+    app.run()
+    tempo = time.perf_counter() - inicio
+    novos = set(sys.modules) - antes
+    print(json.dumps({
+        'primeira_renderizacao_s': tempo,
+        'modulos_importados': len(novos),
+        'bibliotecas': [biblioteca for biblioteca in BIBLIOTECAS if biblioteca in novos],
+        'excecoes': [str(excecao.value) for excecao in app.exception],
+    }))
+
+# Função para somar o tempo dos imports de primeiro nível feitos após o marcador (saída de -X importtime)
+def tempo_imports_s(stderr):
+    total, depois_do_marcador = 0, False
+    for linha in stderr.splitlines():
+        if linha.strip() == MARCADOR:
+            depois_do_marcador = True
+        elif depois_do_marcador and linha.startswith('import time:'):
+            campos = linha[len('import time:'):].split('|')
+            # Imports de primeiro nível têm apenas um espaço antes do nome (os aninhados são indentados)
+            if len(campos) == 3 and campos[1].strip().isdigit() and not campos[2].startswith('  '):
+                total += int(campos[1])
+    return total / 1e6
+
+# Função para renderizar uma página em um processo novo, com as variáveis de ambiente da configuração
+def medir(pagina, configuracao):
+    env = {chave: valor for chave, valor in os.environ.items() if chave != 'PASSOS_MAGICOS_PREAQUECER'}
+    saida = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'benchmarks.bench_inicializacao', '--filho', pagina],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(CAMINHO_APP), env={**env, 'PASSOS_MAGICOS_PERFILAMENTO': '0', **CONFIGURACOES[configuracao]},
+    )
+    resultado = json.loads(saida.stdout.strip().splitlines()[-1])
+    resultado['imports_s'] = tempo_imports_s(saida.stderr)
+    return resultado
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de import e da primeira renderização de cada página do app')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--paginas', nargs='+', default=PAGINAS, choices=PAGINAS)
+    parser.add_argument('--configuracoes', nargs='+', default=list(CONFIGURACOES), choices=list(CONFIGURACOES))
+    parser.add_argument('--filho', choices=PAGINAS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        renderizar_no_filho(args.filho)
+        return
+
+    print(f"{'configuração':>16} {'página':>20} {'imports (s)':>12} {'1ª renderização (s)':>20} {'módulos':>8}  "
+          f"bibliotecas pesadas")
+    for configuracao in args.configuracoes:
+        for pagina in args.paginas:
+            resultados = [medir(pagina, configuracao) for _ in range(args.repeticoes)]
+            excecoes = [excecao for resultado in resultados for excecao in resultado['excecoes']]
+            if excecoes:
+                raise RuntimeError(f'Erro ao renderizar {pagina} ({configuracao}): {excecoes[0]}')
+            print(f"{configuracao:>16} {pagina:>20} {statistics.median(r['imports_s'] for r in resultados):>12.2f} "
+                  f"{statistics.median(r['primeira_renderizacao_s'] for r in resultados):>20.2f} "
+                  f"{resultados[0]['modulos_importados']:>8}  {', '.join(resultados[0]['bibliotecas']) or '-'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# Benchmark de memória: pipeline atual (etapa por etapa) x pipeline fundido
+#
+# Cada medição roda em um processo separado, para que o pico de RSS de uma não contamine a outra.
+# Uso: python -m benchmarks.bench_memoria_pipeline --fatores 10 100
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from dados_sinteticos import gerar_base_pede
+from tratamento_dados import (
+    COLUNAS_INDICADORES,
+    VALORES_INDESEJADOS,
+    pipeline_passos_magicos,
+    pipeline_passos_magicos_fundido,
+)
+
+# Alunos da base original (o tamanho da base sintética é um múltiplo dela) e anos gerados
+ALUNOS_BASE = 1_349
+ANOS = ['2020', '2021', '2022']
+
+IMPLEMENTACOES = {
+    'atual': pipeline_passos_magicos,
+    'fundido': pipeline_passos_magicos_fundido,
+}
+
+# Função para ler um campo de memória (em MiB) de /proc/self/status; None fora do Linux
+def _ler_status_mb(campo):
+    try:
+        with open('/proc/self/status') as arquivo:
+            for linha in arquivo:
+                if linha.startswith(f'{campo}:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+# Função para ler o pico de RSS do processo em MiB (VmHWM no Linux, ru_maxrss nos demais)
+def pico_rss_mb():
+    pico = _ler_status_mb('VmHWM')
+    if pico is not None:
+        return pico
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+
+# Função para zerar o pico de RSS (apenas Linux); retorna False se não for possível
+def zerar_pico_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as arquivo:
+            arquivo.write('5')
+        return True
+    except OSError:
+        return False
+
+# Função para medir uma implementação dentro do processo filho
+def medir_no_filho(nome, fator):
+    year_list = ANOS
+    df = gerar_base_pede(ALUNOS_BASE * fator, year_list)
+
+    rss_entrada = _ler_status_mb('VmRSS') or pico_rss_mb()
+    pico_zerado = zerar_pico_rss()
+    inicio = time.perf_counter()
+    resultado = IMPLEMENTACOES[nome](df, year_list, COLUNAS_INDICADORES, VALORES_INDESEJADOS)
+    tempo = time.perf_counter() - inicio
+    print(json.dumps({
+        'linhas_entrada': len(df),
+        'linhas_saida': len(resultado),
+        'tempo_s': tempo,
+        'rss_entrada_mb': rss_entrada,
+        'pico_rss_mb': pico_rss_mb(),
+        'pico_zerado': pico_zerado,
+    }))
+
+# Função para executar a medição em um processo novo e devolver o resultado
+def medir(nome, fator):
+    saida = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_memoria_pipeline', '--filho', nome, '--fatores', str(fator)],
+        check=True, capture_output=True, text=True, env={**os.environ, 'PASSOS_MAGICOS_PERFILAMENTO': '0'},
+    )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Pico de memória do pipeline atual x fundido')
+    parser.add_argument('--fatores', type=int, nargs='+', default=[10, 100],
+                        help='Tamanho da base sintética em múltiplos da base original')
+    parser.add_argument('--filho', choices=list(IMPLEMENTACOES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        medir_no_filho(args.filho, args.fatores[0])
+        return
+
+    print(f"{'fator':>6} {'linhas':>9} {'implementação':>14} {'tempo (s)':>10} "
+          f"{'RSS entrada (MiB)':>18} {'pico RSS (MiB)':>15} {'acréscimo (MiB)':>16}")
+    for fator in args.fatores:
+        for nome in IMPLEMENTACOES:
+            resultado = medir(nome, fator)
+            # Sem clear_refs o pico inclui a geração da base; o acréscimo fica subestimado para as duas versões
+            acrescimo = resultado['pico_rss_mb'] - resultado['rss_entrada_mb'] if resultado['pico_zerado'] else float('nan')
+            print(f"{fator:>6} {resultado['linhas_entrada']:>9} {nome:>14} {resultado['tempo_s']:>10.2f} "
+                  f"{resultado['rss_entrada_mb']:>18.1f} {resultado['pico_rss_mb']:>15.1f} {acrescimo:>16.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+# Benchmark de escalabilidade do pipeline fundido com os anos processados em paralelo
+#
+# Gera uma base sintética no formato da PEDE com muitos anos (como um backfill histórico, dados_sinteticos.py)
+# e mede o pipeline em série e com 1 a N workers (processos e threads), conferindo que o resultado é idêntico.
+# Uso: python -m benchmarks.bench_paralelo_anos --alunos 20000 --anos 12 --workers 2 4 8
+import argparse
+import os
+import time
+
+from dados_sinteticos import gerar_base_pede
+from tratamento_dados import COLUNAS_INDICADORES, MODOS_PARALELOS, VALORES_INDESEJADOS, pipeline_passos_magicos_fundido
+
+# Função para medir o tempo de execução do pipeline
+def cronometrar(df, year_list, workers, modo):
+    inicio = time.perf_counter()
+    resultado = pipeline_passos_magicos_fundido(df, year_list, COLUNAS_INDICADORES, VALORES_INDESEJADOS,
+                                                workers=workers, modo=modo)
+    return time.perf_counter() - inicio, resultado
+
+def main():
+    parser = argparse.ArgumentParser(description='Escalabilidade do pipeline com os anos processados em paralelo')
+    parser.add_argument('--alunos', type=int, default=20_000)
+    parser.add_argument('--anos', type=int, default=12)
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--modos', nargs='+', default=list(MODOS_PARALELOS), choices=MODOS_PARALELOS)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    year_list = [str(2020 + deslocamento) for deslocamento in range(args.anos)]
+    df = gerar_base_pede(args.alunos, year_list)
+    print(f'{args.alunos} alunos x {len(year_list)} anos ({df.shape[1]} colunas), {os.cpu_count()} núcleos')
+
+    tempos_serie, referencia = zip(*[cronometrar(df, year_list, 1, None) for _ in range(args.repeticoes)])
+    tempo_serie = min(tempos_serie)
+    print(f"{'modo':>10} {'workers':>8} {'tempo (s)':>10} {'speedup':>8} {'idêntico':>9}")
+    print(f"{'série':>10} {1:>8} {tempo_serie:>10.3f} {1:>7.2f}x {'-':>9}")
+    for modo in args.modos:
+        for workers in args.workers:
+            tempos, resultados = zip(*[cronometrar(df, year_list, workers, modo) for _ in range(args.repeticoes)])
+            identico = resultados[0].equals(referencia[0]) and (resultados[0].dtypes == referencia[0].dtypes).all()
+            print(f'{modo:>10} {workers:>8} {min(tempos):>10.3f} {tempo_serie / min(tempos):>7.2f}x {str(identico):>9}')
+
+if __name__ == '__main__':
+    main()
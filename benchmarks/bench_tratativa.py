@@ -0,0 +1,44 @@
+# Benchmark da reestruturação wide -> long: implementação vetorizada x original (iterrows),
+# sobre bases sintéticas no formato da PEDE (dados_sinteticos.py)
+#
+# Uso: python -m benchmarks.bench_tratativa --tamanhos 1000 100000 1000000
+import argparse
+import time
+import warnings
+
+from dados_sinteticos import gerar_base_pede
+from tratamento_dados import tratativa_base_passos_magicos, tratativa_base_passos_magicos_legado
+
+# Função para medir o tempo de execução de uma função
+def cronometrar(func, *args):
+    inicio = time.perf_counter()
+    resultado = func(*args)
+    return time.perf_counter() - inicio, resultado
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da reestruturação wide -> long')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--limite-legado', type=int, default=10_000,
+                        help='Maior quantidade de alunos em que a versão original é executada')
+    parser.add_argument('--anos', nargs='+', default=['2020', '2021', '2022'])
+    args = parser.parse_args()
+    year_list = args.anos
+
+    print(f"{'alunos':>10} {'legado (s)':>12} {'vetorizado (s)':>15} {'speedup':>9} {'idêntico':>9}")
+    for n_alunos in args.tamanhos:
+        df = gerar_base_pede(n_alunos, year_list)
+        tempo_novo, resultado_novo = cronometrar(tratativa_base_passos_magicos, df, year_list)
+
+        if n_alunos <= args.limite_legado:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', FutureWarning)
+                tempo_legado, resultado_legado = cronometrar(tratativa_base_passos_magicos_legado, df, year_list)
+            identico = resultado_legado.equals(resultado_novo) and \
+                (resultado_legado.dtypes == resultado_novo.dtypes).all()
+            print(f'{n_alunos:>10} {tempo_legado:>12.3f} {tempo_novo:>15.3f} '
+                  f'{tempo_legado / tempo_novo:>8.0f}x {str(identico):>9}')
+        else:
+            print(f"{n_alunos:>10} {'-':>12} {tempo_novo:>15.3f} {'-':>9} {'-':>9}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Teste de carga local do serviço de inferência (servico_inferencia.py)
+#
+# Uso: python servico_inferencia.py &
+#      python -m benchmarks.carga_servico --requisicoes 5000 --concorrencia 64
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+FEATURES_PV = ['INDE', 'IAA', 'IEG', 'IPS', 'IDA', 'IPP', 'IPV', 'IAN']
+
+# Função para gerar o corpo de uma requisição aleatória
+def gerar_requisicao(rng):
+    if rng.random() < 0.5:
+        return '/prever/ponto-virada', {col: round(rng.uniform(0, 10), 1) for col in FEATURES_PV}
+    return '/prever/bolsa', {'IPV': round(rng.uniform(0, 10), 1), 'IPP': round(rng.uniform(0, 10), 1)}
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga do serviço de inferência')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--porta', type=int, default=8000)
+    parser.add_argument('--requisicoes', type=int, default=5_000)
+    parser.add_argument('--concorrencia', type=int, default=64)
+    args = parser.parse_args()
+
+    conexoes = threading.local()
+
+    # Cada thread mantém sua própria conexão keep-alive
+    def enviar(semente):
+        if not hasattr(conexoes, 'conexao'):
+            conexoes.conexao = http.client.HTTPConnection(args.host, args.porta)
+        rota, corpo = gerar_requisicao(random.Random(semente))
+        inicio = time.perf_counter()
+        conexoes.conexao.request('POST', rota, body=json.dumps(corpo), headers={'Content-Type': 'application/json'})
+        resposta = conexoes.conexao.getresponse()
+        resposta.read()
+        return (time.perf_counter() - inicio) * 1000, resposta.status
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concorrencia) as executor:
+        resultados = list(executor.map(enviar, range(args.requisicoes)))
+    tempo = time.perf_counter() - inicio
+
+    latencias = np.array([latencia for latencia, _ in resultados])
+    erros = sum(status != 200 for _, status in resultados)
+    print(f'{args.requisicoes} requisições, concorrência {args.concorrencia}: {tempo:.2f} s '
+          f'({args.requisicoes / tempo:.0f} req/s), erros: {erros}')
+    print(f'cliente  p50: {np.percentile(latencias, 50):.1f} ms  p99: {np.percentile(latencias, 99):.1f} ms')
+
+    conexao = http.client.HTTPConnection(args.host, args.porta)
+    conexao.request('GET', '/metricas')
+    print('servidor', json.dumps(json.loads(conexao.getresponse().read()), indent=2))
+
+if __name__ == '__main__':
+    main()
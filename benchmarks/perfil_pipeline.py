@@ -0,0 +1,43 @@
+# Perfil por etapa de pipeline_passos_magicos, ou por fase de pipeline_passos_magicos_fundido (o usado pelo app),
+# com tempo, pico de memória e formato de entrada/saída
+#
+# Uso: python -m benchmarks.perfil_pipeline --saida trace.json [--repeticoes 3] [--fundido]
+import argparse
+import os
+
+# O perfilamento é decidido na importação de tratamento_dados
+os.environ['PASSOS_MAGICOS_PERFILAMENTO'] = '1'
+
+from leitura_dados import ler_base_passos_magicos  # noqa: E402
+from perfilamento import exportar_trace, registros_perfilamento  # noqa: E402
+from tratamento_dados import (  # noqa: E402
+    COLUNAS_INDICADORES,
+    VALORES_INDESEJADOS,
+    pipeline_passos_magicos,
+    pipeline_passos_magicos_fundido,
+)
+
+def main():
+    parser = argparse.ArgumentParser(description='Perfil por etapa do pipeline')
+    parser.add_argument('caminho_csv', nargs='?', default='PEDE_PASSOS_DATASET_FIAP.csv')
+    parser.add_argument('--anos', nargs='+', default=['2020', '2021', '2022'])
+    parser.add_argument('--repeticoes', type=int, default=1)
+    parser.add_argument('--saida', default='trace_pipeline.json', help='Arquivo .json ou .csv')
+    parser.add_argument('--fundido', action='store_true', help='Perfila o pipeline fundido (usado pelo snapshot do app)')
+    args = parser.parse_args()
+
+    df = ler_base_passos_magicos(args.caminho_csv, args.anos)
+    for _ in range(args.repeticoes):
+        pipeline = pipeline_passos_magicos_fundido if args.fundido else pipeline_passos_magicos
+        pipeline(df.copy(), args.anos, COLUNAS_INDICADORES, VALORES_INDESEJADOS)
+
+    print(f"{'etapa':<32} {'tempo (s)':>10} {'pico (MiB)':>11} {'entrada':>12} {'saída':>12}")
+    for registro in registros_perfilamento():
+        entrada = f"{registro['linhas_entrada']}x{registro['colunas_entrada']}"
+        saida = f"{registro['linhas_saida']}x{registro['colunas_saida']}"
+        etapa = '  ' * registro['nivel'] + registro['etapa']
+        print(f"{etapa:<32} {registro['tempo_s']:>10.4f} {registro['pico_memoria_mb']:>11.2f} {entrada:>12} {saida:>12}")
+    print(f'{exportar_trace(args.saida)} registros gravados em {args.saida}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+# Suíte de desempenho do projeto sobre uma base sintética no formato da PEDE (dados_sinteticos.py)
+#
+# Mede a leitura do CSV, o pipeline de tratamento, as agregações da página de Análises e a inferência dos SVMs
+# (uma linha por vez e em lote). Cada execução é gravada no histórico (JSON Lines) e comparada com a última
+# execução com os mesmos parâmetros, para acusar regressões entre versões.
+# Uso: python -m benchmarks.suite_desempenho --alunos 100000 --anos 2020 2021 2022 [--falhar-em-regressao]
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from agregacoes import calcular_agregacoes
+from dados_sinteticos import gerar_base_pede, salvar_base_pede
+from leitura_dados import ler_base_passos_magicos
+from modelos import obter_modelo, obter_preditor, obter_tabela
+from previsao_lote import prever_alunos
+from tratamento_dados import (
+    COLUNAS_INDICADORES,
+    VALORES_INDESEJADOS,
+    pipeline_passos_magicos,
+    pipeline_passos_magicos_fundido,
+)
+
+CAMINHO_HISTORICO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'historico_desempenho.jsonl')
+
+# Quantidade de previsões de uma linha medidas em cada repetição
+PREVISOES_UNITARIAS = 2_000
+
+# Função para medir uma função várias vezes (mediana e mínimo, em segundos) e devolver o último resultado
+def cronometrar(func, repeticoes):
+    tempos, resultado = [], None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func()
+        tempos.append(time.perf_counter() - inicio)
+    return {'tempo_s': statistics.median(tempos), 'tempo_min_s': min(tempos)}, resultado
+
+# Função para executar todos os casos da suíte sobre uma base sintética
+def executar_suite(n_alunos, anos, repeticoes, seed=55):
+    resultados = {}
+    df_wide = gerar_base_pede(n_alunos, anos, seed=seed)
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_csv = salvar_base_pede(df_wide, os.path.join(diretorio, 'pede_sintetica.csv'))
+        resultados['leitura_csv'], df = cronometrar(lambda: ler_base_passos_magicos(caminho_csv, anos), repeticoes)
+
+    resultados['pipeline'], base = cronometrar(
+        lambda: pipeline_passos_magicos(df, anos, COLUNAS_INDICADORES, VALORES_INDESEJADOS), repeticoes)
+    resultados['pipeline_fundido'], _ = cronometrar(
+        lambda: pipeline_passos_magicos_fundido(df, anos, COLUNAS_INDICADORES, VALORES_INDESEJADOS), repeticoes)
+    resultados['agregacoes'], _ = cronometrar(lambda: calcular_agregacoes(base), repeticoes)
+
+    # Previsão de uma linha como na página "Deploy do Modelo" (tempo por previsão)
+    preditor_pv, tabela_bolsa = obter_preditor('ponto_virada'), obter_tabela('bolsa')
+    linhas = base[COLUNAS_INDICADORES].to_numpy(dtype=np.float64)[:PREVISOES_UNITARIAS]
+    linhas_pv = linhas[:, [COLUNAS_INDICADORES.index(col) for col in preditor_pv.features]]
+    linhas_bolsa = linhas[:, [COLUNAS_INDICADORES.index(col) for col in tabela_bolsa.features]]
+
+    def previsoes_unitarias(preditor, linhas):
+        for linha in linhas:
+            preditor.prever(linha)
+
+    for caso, preditor, linhas_caso in [('inferencia_unitaria_pv', preditor_pv, linhas_pv),
+                                        ('inferencia_unitaria_bolsa', tabela_bolsa, linhas_bolsa)]:
+        medicao, _ = cronometrar(lambda: previsoes_unitarias(preditor, linhas_caso), repeticoes)
+        resultados[caso] = {chave: valor / len(linhas_caso) for chave, valor in medicao.items()}
+
+    # Previsão em lote de toda a base tratada, como na CLI e no upload do app
+    modelo_pv = obter_modelo('ponto_virada')
+    resultados['inferencia_lote'], _ = cronometrar(lambda: prever_alunos(base, modelo_pv, tabela_bolsa), repeticoes)
+
+    tamanhos = {'linhas_wide': len(df_wide), 'linhas_base': len(base)}
+    return resultados, tamanhos
+
+# Função para obter o commit atual (None fora de um repositório git)
+def commit_atual():
+    try:
+        saida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                               cwd=os.path.dirname(CAMINHO_HISTORICO))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return saida.stdout.strip()
+
+# Função para ler as execuções gravadas no histórico
+def ler_historico(caminho=CAMINHO_HISTORICO):
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, encoding='utf-8') as arquivo:
+        return [json.loads(linha) for linha in arquivo if linha.strip()]
+
+# Função para acrescentar uma execução ao histórico
+def gravar_historico(execucao, caminho=CAMINHO_HISTORICO):
+    with open(caminho, 'a', encoding='utf-8') as arquivo:
+        arquivo.write(json.dumps(execucao, ensure_ascii=False) + '\n')
+
+# Função para comparar os casos com a última execução com os mesmos parâmetros (razão > 1 = mais lento)
+def comparar_com_anterior(execucao, historico):
+    anteriores = [anterior for anterior in historico if anterior['parametros'] == execucao['parametros']]
+    if not anteriores:
+        return None, {}
+    anterior = anteriores[-1]
+    return anterior, {caso: medicao['tempo_s'] / anterior['resultados'][caso]['tempo_s']
+                      for caso, medicao in execucao['resultados'].items()
+                      if anterior['resultados'].get(caso, {}).get('tempo_s')}
+
+def main():
+    parser = argparse.ArgumentParser(description='Suíte de desempenho sobre uma base sintética no formato da PEDE')
+    parser.add_argument('--alunos', type=int, default=100_000)
+    parser.add_argument('--anos', nargs='+', default=['2020', '2021', '2022'])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=55)
+    parser.add_argument('--historico', default=CAMINHO_HISTORICO)
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help='Aumento relativo de tempo considerado regressão (0.2 = 20%%)')
+    parser.add_argument('--falhar-em-regressao', action='store_true', help='Sai com código 1 se houver regressão')
+    parser.add_argument('--nao-gravar', action='store_true', help='Não acrescenta a execução ao histórico')
+    args = parser.parse_args()
+
+    resultados, tamanhos = executar_suite(args.alunos, args.anos, args.repeticoes, args.seed)
+    execucao = {
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit_atual(),
+        'parametros': {'alunos': args.alunos, 'anos': args.anos, 'seed': args.seed},
+        'ambiente': {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+                     'plataforma': platform.platform(), 'nucleos': os.cpu_count()},
+        'tamanhos': tamanhos,
+        'repeticoes': args.repeticoes,
+        'resultados': resultados,
+    }
+    anterior, razoes = comparar_com_anterior(execucao, ler_historico(args.historico))
+
+    print(f"{args.alunos} alunos x {len(args.anos)} anos ({tamanhos['linhas_base']} linhas tratadas), "
+          f"commit {execucao['commit'] or '-'}"
+          + (f", comparado com {anterior['commit'] or '-'} de {anterior['data']}" if anterior else ''))
+    print(f"{'caso':<28} {'mediana':>12} {'mínimo':>12} {'anterior':>12} {'variação':>9}")
+    regressoes = []
+    for caso, medicao in resultados.items():
+        # Casos unitários em µs por previsão, os demais em segundos
+        unidade, escala = ('µs', 1e6) if caso.startswith('inferencia_unitaria') else ('s', 1)
+        razao = razoes.get(caso)
+        anterior_formatado = f"{anterior['resultados'][caso]['tempo_s'] * escala:>9.3f} {unidade:<2}" if razao else f"{'-':>12}"
+        marcador = ''
+        if razao is not None and razao > 1 + args.tolerancia:
+            regressoes.append(caso)
+            marcador = '  <- regressão'
+        print(f"{caso:<28} {medicao['tempo_s'] * escala:>9.3f} {unidade:<2} {medicao['tempo_min_s'] * escala:>9.3f} {unidade:<2} "
+              f"{anterior_formatado} {f'{razao - 1:+.0%}' if razao else '-':>9}{marcador}")
+
+    if not args.nao_gravar:
+        gravar_historico(execucao, args.historico)
+        print(f'execução gravada em {args.historico}')
+    if regressoes and args.falhar_em_regressao:
+        print(f"regressões acima de {args.tolerancia:.0%}: {', '.join(regressoes)}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import os
+
+from agregacoes import calcular_agregacoes
+from cache_lru import CacheLRU
+from indice_alunos import IndiceAlunos
+from ingestao_incremental import ARQUIVO_MANIFESTO, carregar_base_incremental, ler_manifesto
+from snapshot_dados import carregar_base_com_snapshot, remover_snapshot
+from tratamento_dados import assinatura_arquivo
+
+# Orçamento de memória para as bases tratadas, agregações e índices de todas as unidades (LRU entre as unidades)
+ORCAMENTO_DADOS_MB = float(os.environ.get('PASSOS_MAGICOS_ORCAMENTO_DADOS_MB', 1024))
+
+# Cache compartilhado por todas as sessões do processo. A chave inclui a assinatura do arquivo, então uma nova versão
+# do CSV gera novas entradas e as antigas saem do cache por LRU. Os valores são compartilhados (não copiados):
+# quem os consome não deve alterá-los.
+_cache = CacheLRU(orcamento_bytes=ORCAMENTO_DADOS_MB * 1024 ** 2)
+
+# O caminho da base é o CSV no formato PEDE ou o diretório de uma base incremental (ingestao_incremental.py).
+# A versão de uma base incremental é a do seu manifesto: cada ano ingerido gera novas entradas no cache.
+def _assinatura_base(caminho):
+    if os.path.isdir(caminho):
+        return assinatura_arquivo(os.path.join(caminho, ARQUIVO_MANIFESTO))
+    return assinatura_arquivo(caminho)
+
+# Função para montar a chave de uma versão da base e dos parâmetros do pipeline
+def _chave(tipo, caminho, year_list, colunas_para_arredondar, valores_indesejados):
+    return (tipo, os.path.abspath(caminho), _assinatura_base(caminho), tuple(year_list or ()),
+            tuple(colunas_para_arredondar), tuple(valores_indesejados))
+
+# Função para ler a base tratada do CSV (pelo snapshot) ou, de uma base incremental, todos os anos ingeridos
+# (já tratados na ingestão: year_list e os parâmetros do pipeline não se aplicam)
+def _ler_base_tratada(caminho, year_list, colunas_para_arredondar, valores_indesejados):
+    if not os.path.isdir(caminho):
+        return carregar_base_com_snapshot(caminho, year_list, colunas_para_arredondar, valores_indesejados)
+    if not ler_manifesto(caminho)['anos']:
+        raise ValueError(f'Base incremental sem anos ingeridos: {caminho}')
+    return carregar_base_incremental(caminho)
+
+# Função para carregar a base tratada, reaproveitando o cache quando o arquivo (ou o manifesto) não mudou
+def carregar_base_tratada(caminho, year_list, colunas_para_arredondar, valores_indesejados):
+    return _cache.obter(
+        _chave('base', caminho, year_list, colunas_para_arredondar, valores_indesejados),
+        lambda: _ler_base_tratada(caminho, year_list, colunas_para_arredondar, valores_indesejados),
+    )
+
+# Função para carregar as agregações (contagens, porcentagens, correlações e recortes) da base tratada
+def carregar_agregacoes(caminho, year_list, colunas_para_arredondar, valores_indesejados):
+    return _cache.obter(
+        _chave('agregacoes', caminho, year_list, colunas_para_arredondar, valores_indesejados),
+        lambda: calcular_agregacoes(
+            carregar_base_tratada(caminho, year_list, colunas_para_arredondar, valores_indesejados)),
+    )
+
+# Função para carregar o índice por aluno (trajetórias e turmas) da base tratada
+def carregar_indice_alunos(caminho, year_list, colunas_para_arredondar, valores_indesejados):
+    return _cache.obter(
+        _chave('indice', caminho, year_list, colunas_para_arredondar, valores_indesejados),
+        lambda: IndiceAlunos(carregar_base_tratada(caminho, year_list, colunas_para_arredondar, valores_indesejados)),
+    )
+
+# Função para forçar o reprocessamento de uma base (cache e snapshot) em todas as sessões
+def invalidar_cache(caminho):
+    if not os.path.isdir(caminho):
+        remover_snapshot(caminho)
+    caminho = os.path.abspath(caminho)
+    _cache.remover_se(lambda chave: chave[1] == caminho)
+
+# Função para listar o que está em cache (tipo, arquivo e memória de cada entrada) e o uso do orçamento
+def info_cache():
+    entradas = [{'tipo': chave[0], 'arquivo': chave[1], 'memoria_mb': tamanho / 1024 ** 2}
+                for chave, tamanho in _cache.tamanhos()]
+    return entradas, _cache.estatisticas()
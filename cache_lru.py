@@ -0,0 +1,129 @@
+import sys
+import threading
+from collections import OrderedDict
+
+# Cache LRU em memória, compartilhado pelo processo inteiro (todas as sessões e unidades), com orçamento de memória:
+# ao passar do orçamento, as entradas usadas há mais tempo são descartadas.
+
+# Função para estimar a memória (em bytes) de um valor guardado no cache
+def tamanho_objeto(valor):
+    if hasattr(valor, 'memory_usage') and hasattr(valor, 'columns'):
+        return int(valor.memory_usage(deep=True).sum())  # DataFrame
+    if hasattr(valor, 'nbytes'):
+        return int(valor.nbytes)  # ndarray / Series
+    if isinstance(valor, dict):
+        return sum(tamanho_objeto(item) for item in valor.values()) + sys.getsizeof(valor)
+    if isinstance(valor, (list, tuple)):
+        return sum(tamanho_objeto(item) for item in valor) + sys.getsizeof(valor)
+    if hasattr(valor, '__dict__'):
+        return tamanho_objeto(vars(valor))
+    return sys.getsizeof(valor)
+
+class CacheLRU:
+    def __init__(self, orcamento_bytes=None, max_entradas=None, tamanho=tamanho_objeto):
+        self.orcamento_bytes = orcamento_bytes
+        self.max_entradas = max_entradas
+        self.tamanho = tamanho
+        self._entradas = OrderedDict()  # chave -> (valor, tamanho em bytes), da menos para a mais usada
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._locks_carga = {}
+        self.acertos = self.faltas = self.descartes = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, chave):
+        return chave in self._entradas
+
+    # Valor da chave (marcado como o mais recente), ou o padrão se não estiver no cache
+    def get(self, chave, padrao=None):
+        with self._lock:
+            if chave not in self._entradas:
+                return padrao
+            self._entradas.move_to_end(chave)
+            return self._entradas[chave][0]
+
+    def __getitem__(self, chave):
+        with self._lock:
+            self._entradas.move_to_end(chave)
+            return self._entradas[chave][0]
+
+    def __setitem__(self, chave, valor):
+        tamanho = self.tamanho(valor)
+        with self._lock:
+            if chave in self._entradas:
+                self._bytes -= self._entradas.pop(chave)[1]
+            self._entradas[chave] = (valor, tamanho)
+            self._bytes += tamanho
+            self._descartar_excesso()
+
+    # Descarta as entradas menos usadas até caber no orçamento (a entrada mais recente nunca é descartada)
+    def _descartar_excesso(self):
+        while len(self._entradas) > 1 and (
+                (self.orcamento_bytes is not None and self._bytes > self.orcamento_bytes)
+                or (self.max_entradas is not None and len(self._entradas) > self.max_entradas)):
+            _, (_, tamanho) = self._entradas.popitem(last=False)
+            self._bytes -= tamanho
+            self.descartes += 1
+
+    def pop(self, chave, padrao=None):
+        with self._lock:
+            if chave not in self._entradas:
+                return padrao
+            valor, tamanho = self._entradas.pop(chave)
+            self._bytes -= tamanho
+            return valor
+
+    # Remove as entradas cujas chaves atendem ao critério (ex.: todas as versões de um arquivo)
+    def remover_se(self, criterio):
+        with self._lock:
+            for chave in [chave for chave in self._entradas if criterio(chave)]:
+                self.pop(chave)
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def items(self):
+        with self._lock:
+            return [(chave, valor) for chave, (valor, _) in self._entradas.items()]
+
+    # Chaves e memória estimada (em bytes) de cada entrada, da menos para a mais usada
+    def tamanhos(self):
+        with self._lock:
+            return [(chave, tamanho) for chave, (_, tamanho) in self._entradas.items()]
+
+    # Valor da chave, calculado por carregar() apenas uma vez mesmo com várias threads pedindo a mesma chave
+    def obter(self, chave, carregar):
+        with self._lock:
+            if chave in self._entradas:
+                self.acertos += 1
+                return self[chave]
+            lock_carga = self._locks_carga.setdefault(chave, threading.Lock())
+        with lock_carga:
+            with self._lock:
+                if chave in self._entradas:
+                    self.acertos += 1
+                    return self[chave]
+                self.faltas += 1
+            try:
+                valor = carregar()
+                self[chave] = valor
+            finally:
+                with self._lock:
+                    self._locks_carga.pop(chave, None)
+        return valor
+
+    # Resumo do cache (entradas, memória ocupada, orçamento e contadores)
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'entradas': len(self._entradas),
+                'memoria_mb': self._bytes / 1024 ** 2,
+                'orcamento_mb': None if self.orcamento_bytes is None else self.orcamento_bytes / 1024 ** 2,
+                'acertos': self.acertos,
+                'faltas': self.faltas,
+                'descartes': self.descartes,
+            }
@@ -0,0 +1,132 @@
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+from tratamento_dados import VALORES_INDESEJADOS
+
+# Gerador de bases sintéticas no formato wide da PEDE (uma linha por aluno, um grupo de colunas por ano),
+# para medir o desempenho do projeto com qualquer quantidade de alunos e de anos.
+CAMINHO_REFERENCIA = 'PEDE_PASSOS_DATASET_FIAP.csv'
+
+# Colunas de cada layout, na ordem da base real. O ano 2020 usa o layout de 2020 (FASE_TURMA), 2021 o de 2021 e
+# os demais anos o de 2022 (o único com INDICADO_BOLSA), como na base real.
+LAYOUTS = {
+    '2020': ['INSTITUICAO_ENSINO_ALUNO', 'IDADE_ALUNO', 'ANOS_PM', 'FASE_TURMA', 'PONTO_VIRADA', 'INDE',
+             'INDE_CONCEITO', 'PEDRA', 'DESTAQUE_IEG', 'DESTAQUE_IDA', 'DESTAQUE_IPV', 'IAA', 'IEG', 'IPS', 'IDA',
+             'IPP', 'IPV', 'IAN'],
+    '2021': ['FASE', 'TURMA', 'INSTITUICAO_ENSINO_ALUNO', 'SINALIZADOR_INGRESSANTE', 'PEDRA', 'INDE', 'IAA', 'IEG',
+             'IPS', 'IDA', 'IPP', 'REC_EQUIPE_1', 'REC_EQUIPE_2', 'REC_EQUIPE_3', 'REC_EQUIPE_4', 'PONTO_VIRADA',
+             'IPV', 'IAN', 'NIVEL_IDEAL', 'DEFASAGEM'],
+    '2022': ['FASE', 'TURMA', 'ANO_INGRESSO', 'BOLSISTA', 'INDE', 'CG', 'CF', 'CT', 'PEDRA', 'DESTAQUE_IEG',
+             'DESTAQUE_IDA', 'DESTAQUE_IPV', 'IAA', 'IEG', 'IPS', 'IDA', 'NOTA_PORT', 'NOTA_MAT', 'NOTA_ING',
+             'QTD_AVAL', 'IPP', 'REC_AVA_1', 'REC_AVA_2', 'REC_AVA_3', 'REC_AVA_4', 'INDICADO_BOLSA', 'PONTO_VIRADA',
+             'IPV', 'IAN', 'NIVEL_IDEAL'],
+}
+
+# Limites do INDE de cada Pedra-Conceito (a partir do limite inferior)
+LIMITES_PEDRA = [(8.198, 'Topázio'), (7.154, 'Ametista'), (6.109, 'Ágata'), (-np.inf, 'Quartzo')]
+
+# Sentinelas da base real, as mesmas filtradas pelo pipeline: '#NULO!' a partir de 2021 e 'D9891/2A' em 2020
+SENTINELA, SENTINELA_2020 = VALORES_INDESEJADOS
+
+# Função para escolher o layout de colunas de um ano
+def layout_ano(year):
+    return year if year in ('2020', '2021') else '2022'
+
+# Valores observados de cada coluna da base de referência (usados nas colunas que o pipeline não utiliza)
+@functools.lru_cache(maxsize=2)
+def _valores_referencia(caminho):
+    if not os.path.exists(caminho):
+        return {}
+    df = pd.read_csv(caminho, sep=';')
+    return {col: df[col].dropna().to_numpy() for col in df.columns}
+
+# Função para gerar os anos em que cada aluno está na base: uma parte já está no primeiro ano, os demais entram
+# em um ano sorteado, e cada aluno permanece nos anos seguintes com a probabilidade de permanência
+# (a cobertura por aluno é esparsa, como na base real: cerca de 55% dos alunos em cada ano)
+def _presenca(rng, n_alunos, n_anos, permanencia, entrada_inicial):
+    entrada = np.where(rng.random(n_alunos) < entrada_inicial, 0, rng.integers(1, max(n_anos, 2), size=n_alunos))
+    presente = np.zeros((n_alunos, n_anos), dtype=bool)
+    ativo = np.ones(n_alunos, dtype=bool)
+    for posicao in range(n_anos):
+        presente[:, posicao] = ativo & (entrada <= posicao)
+        ativo &= (entrada > posicao) | (rng.random(n_alunos) < permanencia)
+    return presente
+
+# Função para gerar um indicador de 0 a 10 com distribuição próxima à da base real
+def _indicador(rng, n, media=7.0, desvio=1.5):
+    return np.clip(rng.normal(media, desvio, size=n), 0, 10)
+
+# Função para gerar uma base sintética no formato wide da PEDE
+def gerar_base_pede(n_alunos, anos=('2020', '2021', '2022'), permanencia=0.7, entrada_inicial=0.55,
+                    taxa_sentinela=0.002, seed=55, caminho_referencia=CAMINHO_REFERENCIA):
+    rng = np.random.default_rng(seed)
+    anos = [str(ano) for ano in anos]
+    presente = _presenca(rng, n_alunos, len(anos), permanencia, entrada_inicial)
+    referencia = _valores_referencia(caminho_referencia)
+
+    colunas = {'NOME': np.array([f'ALUNO-{i + 1}' for i in range(n_alunos)], dtype=object)}
+    fase = rng.integers(0, 8, size=n_alunos)
+    for posicao, year in enumerate(anos):
+        layout = layout_ano(year)
+        linhas = presente[:, posicao]
+        n = int(linhas.sum())
+
+        # Indicadores, INDE (média dos indicadores) e alvos derivados deles
+        valores = {col: _indicador(rng, n) for col in ('IAA', 'IEG', 'IPS', 'IDA', 'IPP', 'IPV')}
+        valores['IAN'] = rng.choice([2.5, 5.0, 10.0], size=n, p=[0.1, 0.6, 0.3])
+        valores['INDE'] = np.mean(list(valores.values()), axis=0)
+        valores['PEDRA'] = np.select([valores['INDE'] > limite for limite, _ in LIMITES_PEDRA],
+                                     [pedra for _, pedra in LIMITES_PEDRA]).astype(object)
+        valores['PONTO_VIRADA'] = np.where(valores['IPV'] + rng.normal(0, 0.5, size=n) > 8.5, 'Sim', 'Não').astype(object)
+        valores['INDICADO_BOLSA'] = np.where(
+            (valores['IPV'] + valores['IPP']) / 2 + rng.normal(0, 0.7, size=n) > 7.8, 'Sim', 'Não').astype(object)
+
+        # Fase (avança um por ano) e turma; em 2020 as duas vêm juntas em FASE_TURMA (ex.: '2H')
+        fase_ano = np.minimum(fase + posicao, 8)[linhas]
+        turma = rng.choice(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'), size=n)
+        if layout == '2020':
+            valores['FASE_TURMA'] = np.char.add(fase_ano.astype(str), turma).astype(object)
+        else:
+            valores['FASE'], valores['TURMA'] = fase_ano.astype(float), turma.astype(object)
+
+        # Sentinelas: linhas com a Pedra e o Ponto de Virada inválidos
+        sentinelas = rng.random(n) < taxa_sentinela
+        valores['PEDRA'][sentinelas] = SENTINELA_2020 if layout == '2020' else SENTINELA
+        if layout != '2020':
+            valores['PONTO_VIRADA'][sentinelas] = SENTINELA
+
+        for col in LAYOUTS[layout]:
+            if col in valores:
+                dados = valores[col]
+            elif col in referencia and len(referencia[col]):
+                dados = rng.choice(referencia[col], size=n)
+            else:
+                dados = np.full(n, np.nan)
+            coluna = np.full(n_alunos, np.nan, dtype=dados.dtype if dados.dtype.kind == 'f' else object)
+            coluna[linhas] = dados
+            colunas[f'{col}_{year}'] = coluna
+
+    return pd.DataFrame(colunas)
+
+# Função para gravar a base sintética no formato do arquivo original (separador ';')
+def salvar_base_pede(df, caminho):
+    df.to_csv(caminho, sep=';', index=False)
+    return caminho
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Gera uma base sintética no formato wide da PEDE')
+    parser.add_argument('saida', help='Arquivo CSV de saída')
+    parser.add_argument('--alunos', type=int, default=100_000)
+    parser.add_argument('--anos', nargs='+', default=['2020', '2021', '2022'])
+    parser.add_argument('--seed', type=int, default=55)
+    args = parser.parse_args()
+
+    df = gerar_base_pede(args.alunos, args.anos, seed=args.seed)
+    salvar_base_pede(df, args.saida)
+    print(f'{args.saida}: {len(df)} alunos x {len(args.anos)} anos, {df.shape[1]} colunas, '
+          f'{os.path.getsize(args.saida) / 1024 ** 2:.1f} MiB')
@@ -0,0 +1,83 @@
+import numpy as np
+
+# Índice da base longa por aluno: as linhas de cada NOME ficam contíguas e ordenadas por ANO,
+# de modo que a trajetória de um aluno é um fatiamento (O(1)) em vez de um filtro sobre a base inteira
+class IndiceAlunos:
+    def __init__(self, df):
+        self.base = df.sort_values(['NOME', 'ANO'], kind='stable').reset_index(drop=True)
+
+        # Posição inicial e final das linhas de cada aluno na base ordenada
+        nomes = self.base['NOME'].astype(str).to_numpy()
+        inicios = np.flatnonzero(np.r_[True, nomes[1:] != nomes[:-1]])
+        fins = np.r_[inicios[1:], len(nomes)]
+        self.posicoes = {nomes[inicio]: (int(inicio), int(fim)) for inicio, fim in zip(inicios, fins)}
+        # Nomes ordenados pela chave de busca (nome em casefold), para buscar sem diferenciar maiúsculas e minúsculas
+        self.nomes = np.array(sorted(self.posicoes, key=lambda nome: (nome.casefold(), nome)), dtype=object)
+        self.chaves_busca = np.array([nome.casefold() for nome in self.nomes], dtype=object)
+        self.anos = self.base['ANO'].astype(str).to_numpy()
+
+        # Chaves secundárias: linhas de cada (ANO, FASE, TURMA)
+        self.turmas = {
+            (str(ano), int(fase), str(turma)): linhas
+            for (ano, fase, turma), linhas in self.base.groupby(['ANO', 'FASE', 'TURMA'], observed=True).indices.items()
+        }
+
+    def __len__(self):
+        return len(self.posicoes)
+
+    def __contains__(self, nome):
+        return nome in self.posicoes
+
+    # Trajetória do aluno em todos os anos (DataFrame vazio se o aluno não existir)
+    def trajetoria(self, nome):
+        inicio, fim = self.posicoes.get(nome, (0, 0))
+        return self.base.iloc[inicio:fim]
+
+    # Registro do aluno em um ano (None se não houver), com busca binária dentro das linhas do aluno
+    def registro(self, nome, ano):
+        inicio, fim = self.posicoes.get(nome, (0, 0))
+        posicao = inicio + int(np.searchsorted(self.anos[inicio:fim], str(ano)))
+        if posicao < fim and self.anos[posicao] == str(ano):
+            return self.base.iloc[posicao]
+        return None
+
+    # Alunos de uma turma em um ano
+    def alunos_da_turma(self, ano, fase, turma):
+        linhas = self.turmas.get((str(ano), int(fase), str(turma)), np.array([], dtype=np.intp))
+        return self.base.iloc[linhas]
+
+    # Nomes que começam com o prefixo informado, sem diferenciar maiúsculas e minúsculas (em ordem alfabética),
+    # por busca binária sobre as chaves em casefold
+    def buscar_nomes(self, prefixo, limite=50):
+        prefixo = prefixo.casefold()
+        inicio = np.searchsorted(self.chaves_busca, prefixo, side='left')
+        fim = np.searchsorted(self.chaves_busca, prefixo + '\uffff', side='right')
+        return list(self.nomes[inicio:min(fim, inicio + limite)])
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from snapshot_dados import COLUNAS_INDICADORES, VALORES_INDESEJADOS, carregar_base_com_snapshot
+
+    parser = argparse.ArgumentParser(description='Consulta a trajetória de um aluno pelo índice da base')
+    parser.add_argument('nome', help='Nome do aluno (ex.: ALUNO-123)')
+    parser.add_argument('caminho_csv', nargs='?', default='PEDE_PASSOS_DATASET_FIAP.csv')
+    parser.add_argument('--anos', nargs='+', default=['2020', '2021', '2022'])
+    args = parser.parse_args()
+
+    df = carregar_base_com_snapshot(args.caminho_csv, args.anos, COLUNAS_INDICADORES, VALORES_INDESEJADOS)
+    inicio = time.perf_counter()
+    indice = IndiceAlunos(df)
+    tempo_construcao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    trajetoria = indice.trajetoria(args.nome)
+    tempo_indice = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    df[df['NOME'] == args.nome]
+    tempo_filtro = time.perf_counter() - inicio
+
+    print(trajetoria.to_string(index=False) if len(trajetoria) else f'{args.nome} não encontrado')
+    print(f'índice de {len(indice)} alunos construído em {tempo_construcao * 1000:.1f} ms; '
+          f'consulta {tempo_indice * 1e6:.0f} µs x filtro na base {tempo_filtro * 1e6:.0f} µs')
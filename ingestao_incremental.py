@@ -0,0 +1,146 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from leitura_dados import ler_base_passos_magicos
+from schema_dados import COLUNAS_CATEGORICAS, tipar_base
+from snapshot_dados import COLUNAS_INDICADORES, VALORES_INDESEJADOS, carregar_snapshot, salvar_snapshot
+from tratamento_dados import (
+    COLUNAS_RESTAURADAS,
+    assinatura_arquivo,
+    cleaning_dataset,
+    filter_unwanted_values,
+    pipeline_passos_magicos,
+    round_columns,
+    tratar_fase_turma,
+    tratativa_base_passos_magicos,
+)
+
+# Diretório da base em formato longo, com um arquivo por ano e o manifesto de ingestão
+DIRETORIO_BASE = 'base_passos_magicos'
+ARQUIVO_MANIFESTO = 'manifesto.json'
+
+# Função para montar o caminho do arquivo de um ano
+def caminho_particao(diretorio, ano):
+    return os.path.join(diretorio, f'ANO={ano}.feather')
+
+# Função para ler o manifesto (anos já ingeridos, arquivos de origem e colunas da base)
+def ler_manifesto(diretorio=DIRETORIO_BASE):
+    caminho = os.path.join(diretorio, ARQUIVO_MANIFESTO)
+    if not os.path.exists(caminho):
+        return {'colunas': None, 'anos': {}}
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+# Função para gravar o manifesto de forma atômica
+def salvar_manifesto(manifesto, diretorio=DIRETORIO_BASE):
+    caminho = os.path.join(diretorio, ARQUIVO_MANIFESTO)
+    caminho_temp = f'{caminho}.{os.getpid()}.tmp'
+    with open(caminho_temp, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+    os.replace(caminho_temp, caminho)
+
+# Função para gravar os dados de um ano e registrá-lo no manifesto
+def _gravar_ano(df_ano, ano, caminho_csv, manifesto, diretorio):
+    assinatura = assinatura_arquivo(caminho_csv)
+    salvar_snapshot(tipar_base(df_ano, COLUNAS_INDICADORES), caminho_particao(diretorio, ano),
+                    {'ano': ano, 'assinatura': assinatura})
+    manifesto['anos'][ano] = {
+        'arquivo_origem': os.path.abspath(caminho_csv),
+        'assinatura': assinatura,
+        'linhas': len(df_ano),
+        'ingerido_em': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+# Função para criar a base a partir do histórico completo (executada uma única vez)
+def inicializar_base(caminho_csv, year_list, diretorio=DIRETORIO_BASE,
+                     colunas_para_arredondar=COLUNAS_INDICADORES, valores_indesejados=VALORES_INDESEJADOS):
+    os.makedirs(diretorio, exist_ok=True)
+    df = ler_base_passos_magicos(caminho_csv, year_list)
+    df_final = pipeline_passos_magicos(df, year_list, colunas_para_arredondar, valores_indesejados)
+
+    manifesto = {'colunas': list(df_final.columns), 'anos': {}}
+    for ano in year_list:
+        _gravar_ano(df_final[df_final['ANO'] == ano], ano, caminho_csv, manifesto, diretorio)
+    salvar_manifesto(manifesto, diretorio)
+    return manifesto
+
+# Função para processar apenas um ano, mantendo as colunas já existentes na base
+def processar_ano(df, ano, colunas_base, colunas_para_arredondar, valores_indesejados):
+    df_ano = tratativa_base_passos_magicos(df, [ano])
+    if 'FASE_TURMA' in df_ano.columns:
+        df_ano = tratar_fase_turma(df_ano)
+    df_ano = cleaning_dataset(df_ano)
+
+    faltando = [col for col in colunas_base if col not in df_ano.columns]
+    if faltando:
+        raise ValueError(f'Colunas ausentes para o ano {ano}: {", ".join(faltando)}')
+
+    # No lugar de drop_null_columns (que removeria colunas de toda a base), descarta as linhas incompletas do ano
+    df_ano = df_ano[colunas_base]
+    df_ano = df_ano.dropna(subset=[col for col in colunas_base if col not in COLUNAS_RESTAURADAS])
+
+    df_ano = round_columns(df_ano, colunas_para_arredondar)
+    return filter_unwanted_values(df_ano, 'PEDRA', valores_indesejados)
+
+# Função para ingerir um novo ano sem reprocessar os anos anteriores
+def ingerir_ano(caminho_csv, ano, diretorio=DIRETORIO_BASE, substituir=False,
+                colunas_para_arredondar=COLUNAS_INDICADORES, valores_indesejados=VALORES_INDESEJADOS):
+    manifesto = ler_manifesto(diretorio)
+    if manifesto['colunas'] is None:
+        raise ValueError(f'Base não inicializada em {diretorio}; execute inicializar_base primeiro')
+
+    registrado = manifesto['anos'].get(ano)
+    if registrado is not None:
+        if registrado['assinatura'] == assinatura_arquivo(caminho_csv):
+            return None  # Ano já ingerido a partir deste mesmo arquivo
+        if not substituir:
+            raise ValueError(f'O ano {ano} já foi ingerido a partir de outro arquivo; use substituir=True')
+
+    df = ler_base_passos_magicos(caminho_csv, [ano])
+    df_ano = processar_ano(df, ano, manifesto['colunas'], colunas_para_arredondar, valores_indesejados)
+    _gravar_ano(df_ano, ano, caminho_csv, manifesto, diretorio)
+    salvar_manifesto(manifesto, diretorio)
+    return manifesto['anos'][ano]
+
+# Função para carregar a base completa (todos os anos ingeridos)
+def carregar_base_incremental(diretorio=DIRETORIO_BASE):
+    manifesto = ler_manifesto(diretorio)
+    partes = [carregar_snapshot(caminho_particao(diretorio, ano)) for ano in sorted(manifesto['anos'])]
+    if not partes:
+        return pd.DataFrame(columns=manifesto['colunas'] or [])
+    df = pd.concat(partes, ignore_index=True)
+    for col in COLUNAS_CATEGORICAS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Ingestão incremental dos anos da base PEDE')
+    parser.add_argument('--diretorio', default=DIRETORIO_BASE)
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    inicializar = comandos.add_parser('inicializar', help='Cria a base a partir do histórico completo')
+    inicializar.add_argument('caminho_csv')
+    inicializar.add_argument('--anos', nargs='+', required=True)
+
+    ingerir = comandos.add_parser('ingerir', help='Acrescenta um novo ano à base')
+    ingerir.add_argument('caminho_csv')
+    ingerir.add_argument('--ano', required=True)
+    ingerir.add_argument('--substituir', action='store_true', help='Reprocessa o ano se a origem mudou')
+
+    comandos.add_parser('status', help='Mostra os anos já ingeridos')
+    args = parser.parse_args()
+
+    if args.comando == 'inicializar':
+        inicializar_base(args.caminho_csv, args.anos, args.diretorio)
+    elif args.comando == 'ingerir':
+        if ingerir_ano(args.caminho_csv, args.ano, args.diretorio, args.substituir) is None:
+            print(f'Ano {args.ano} já ingerido a partir deste arquivo; nada a fazer')
+
+    for ano, info in sorted(ler_manifesto(args.diretorio)['anos'].items()):
+        print(f"{ano}: {info['linhas']} linhas de {info['arquivo_origem']} (ingerido em {info['ingerido_em']})")
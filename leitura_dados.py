@@ -0,0 +1,133 @@
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from tratamento_dados import (
+    COLUNAS_INDICADORES,
+    COLUNAS_RESTAURADAS,
+    PADRAO_COLUNA_ANO,
+    VALORES_INDESEJADOS,
+    cleaning_dataset,
+    drop_null_columns,
+    filter_unwanted_values,
+    restore_columns,
+    round_columns,
+    tratar_fase_turma,
+    tratativa_base_passos_magicos,
+)
+
+# Colunas (sem o sufixo de ano) usadas por pipeline_passos_magicos e o tipo declarado de cada uma.
+# Os indicadores são lidos como texto porque a base traz códigos como 'D980' e '#NULO!' no lugar das notas;
+# a conversão para número acontece em round_columns, como na leitura original.
+SCHEMA_COLUNAS = {
+    'FASE_TURMA': 'object',
+    'PONTO_VIRADA': 'object',
+    'PEDRA': 'object',
+    'TURMA': 'object',
+    'INDICADO_BOLSA': 'object',
+    'FASE': 'float64',
+    'INDE': 'object',
+    'IAA': 'object',
+    'IEG': 'object',
+    'IPS': 'object',
+    'IDA': 'object',
+    'IPP': 'object',
+    'IPV': 'object',
+    'IAN': 'object',
+}
+
+# Função para listar as colunas do arquivo sem carregar os dados
+def ler_cabecalho(caminho, sep=';'):
+    return list(pd.read_csv(caminho, sep=sep, nrows=0).columns)
+
+# Função para montar as colunas a serem lidas e seus tipos, a partir do cabeçalho do arquivo
+def colunas_necessarias(cabecalho, year_list=None):
+    dtypes = {'NOME': 'object'}
+    for col in cabecalho:
+        match = PADRAO_COLUNA_ANO.match(col)
+        if not match or match.group('coluna') not in SCHEMA_COLUNAS:
+            continue
+        if year_list is not None and match.group('ano') not in year_list:
+            continue
+        dtypes[col] = SCHEMA_COLUNAS[match.group('coluna')]
+    # Mantém a ordem original do arquivo
+    return {col: dtypes[col] for col in cabecalho if col in dtypes}
+
+# Função para ler a base apenas com as colunas usadas pelo pipeline (substitui o pd.read_csv completo)
+def ler_base_passos_magicos(caminho, year_list=None, chunksize=None, sep=';'):
+    dtypes = colunas_necessarias(ler_cabecalho(caminho, sep), year_list)
+    return pd.read_csv(caminho, sep=sep, usecols=list(dtypes), dtype=dtypes, chunksize=chunksize)
+
+# Pipeline processando o arquivo em blocos de linhas, mantendo em memória apenas as linhas já limpas
+def pipeline_passos_magicos_em_blocos(caminho, year_list, colunas_para_arredondar, valores_indesejados,
+                                      chunksize=50_000):
+    partes, total_linhas = [], 0
+    for bloco in ler_base_passos_magicos(caminho, year_list, chunksize=chunksize):
+        df_combined = tratativa_base_passos_magicos(bloco, year_list)
+        df_combined = tratar_fase_turma(df_combined)
+
+        # Guarda a posição (ano, linha) de cada registro para reconstruir o índice da versão sem blocos
+        posicao_ano = np.arange(len(df_combined)) // max(len(bloco), 1)
+        linha_original = np.tile(bloco.index.to_numpy(), len(year_list))
+        df_combined.index = pd.MultiIndex.from_arrays([posicao_ano, linha_original])
+
+        partes.append(cleaning_dataset(df_combined))
+        total_linhas += len(bloco)
+
+    df_cleaned = pd.concat(partes)
+    df_cleaned.index = (df_cleaned.index.get_level_values(0) * total_linhas
+                        + df_cleaned.index.get_level_values(1))
+    df_cleaned = df_cleaned.sort_index()
+    df_restaurar = df_cleaned
+
+    df_cleaned = drop_null_columns(df_cleaned)
+    df_cleaned = restore_columns(df_cleaned, df_restaurar, COLUNAS_RESTAURADAS)
+    df_cleaned = round_columns(df_cleaned, colunas_para_arredondar)
+    return filter_unwanted_values(df_cleaned, 'PEDRA', valores_indesejados)
+
+# Função para medir o tempo e o pico de memória alocada de uma função
+def medir_leitura(func, *args, **kwargs):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        resultado = func(*args, **kwargs)
+        tempo = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, {'tempo_s': tempo, 'pico_memoria_mb': pico / 1024 ** 2}
+
+if __name__ == '__main__':
+    import argparse
+
+    from tratamento_dados import pipeline_passos_magicos
+
+    parser = argparse.ArgumentParser(description='Compara a leitura completa do CSV com a leitura podada e em blocos')
+    parser.add_argument('caminho_csv', nargs='?', default='PEDE_PASSOS_DATASET_FIAP.csv')
+    parser.add_argument('--chunksize', type=int, default=50_000)
+    args = parser.parse_args()
+
+    year_list = ['2020', '2021', '2022']
+
+    def pipeline_leitura_completa():
+        df = pd.read_csv(args.caminho_csv, sep=';')
+        return pipeline_passos_magicos(df, year_list, COLUNAS_INDICADORES, VALORES_INDESEJADOS)
+
+    def pipeline_leitura_podada():
+        df = ler_base_passos_magicos(args.caminho_csv, year_list)
+        return pipeline_passos_magicos(df, year_list, COLUNAS_INDICADORES, VALORES_INDESEJADOS)
+
+    def pipeline_em_blocos():
+        return pipeline_passos_magicos_em_blocos(args.caminho_csv, year_list, COLUNAS_INDICADORES,
+                                                 VALORES_INDESEJADOS, chunksize=args.chunksize)
+
+    referencia = None
+    for nome, func in [('leitura completa', pipeline_leitura_completa),
+                       ('leitura podada', pipeline_leitura_podada),
+                       ('em blocos', pipeline_em_blocos)]:
+        resultado, relatorio = medir_leitura(func)
+        referencia = resultado if referencia is None else referencia
+        print(f"{nome:>17}: {relatorio['tempo_s']:.3f} s, pico {relatorio['pico_memoria_mb']:.1f} MiB, "
+              f'{len(resultado)} linhas, igual à leitura completa: {resultado.equals(referencia)}')
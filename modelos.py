@@ -0,0 +1,221 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from cache_lru import CacheLRU
+from preditor_numpy import (PreditorNumpy, amostra_entradas, carregar_preditor, exportar_preditor, sha256_arquivo,
+                            verificar_equivalencia)
+from tabela_previsao import TabelaPrevisao
+
+# Modelos disponíveis, por nome, e o caminho do artefato de cada um
+CAMINHOS_MODELOS = {
+    'ponto_virada': 'modelo_svm_pv.joblib',
+    'bolsa': 'modelo_svm_b.joblib',
+}
+
+# Ordem das features usada no treino de cada modelo
+FEATURES_MODELOS = {
+    'ponto_virada': ['INDE', 'IAA', 'IEG', 'IPS', 'IDA', 'IPP', 'IPV', 'IAN'],
+    'bolsa': ['IPV', 'IPP'],
+}
+
+# Relatório de avaliação gerado por treino_modelos.py e lido pela página de Análises
+CAMINHO_RELATORIO = 'relatorio_modelos.json'
+
+# Modo de memory-map dos arrays do modelo (ex.: 'r'); desativado por padrão
+MMAP_MODE = os.environ.get('PASSOS_MAGICOS_MMAP_MODELOS') or None
+
+# Orçamento de memória dos modelos carregados de todas as unidades (modelos do sklearn, preditores NumPy e tabelas
+# de previsão somados); acima dele os menos usados são descarregados (LRU)
+ORCAMENTO_MODELOS_MB = float(os.environ.get('PASSOS_MAGICOS_ORCAMENTO_MODELOS_MB', 256))
+
+# Função para estimar a memória de um item do registro (entrada de modelo/preditor ou tabela de previsão)
+def _tamanho_carregado(valor):
+    if isinstance(valor, TabelaPrevisao):
+        return valor.bits.nbytes
+    return int(valor['memoria_mb'] * 1024 ** 2)
+
+# Registro compartilhado pelo processo inteiro (todas as sessões do Streamlit), com chave (tipo, nome):
+# 'sklearn' para os modelos, 'numpy' para os preditores NumPy e 'tabela' para as tabelas de previsão
+_carregados = CacheLRU(orcamento_bytes=ORCAMENTO_MODELOS_MB * 1024 ** 2, tamanho=_tamanho_carregado)
+# Reentrante: a carga de um preditor sem .npz obtém o modelo do sklearn pelo próprio registro
+_lock = threading.RLock()
+_logger = logging.getLogger(__name__)
+
+# Função para estimar a memória ocupada pelos arrays do modelo (inclui etapas de um Pipeline)
+def memoria_modelo(modelo):
+    total, pendentes, vistos = 0, [modelo], set()
+    while pendentes:
+        objeto = pendentes.pop()
+        if id(objeto) in vistos:
+            continue
+        vistos.add(id(objeto))
+        if isinstance(objeto, np.ndarray):
+            total += objeto.nbytes
+        elif isinstance(objeto, (list, tuple)):
+            pendentes.extend(objeto)
+        elif isinstance(objeto, dict):
+            pendentes.extend(objeto.values())
+        elif hasattr(objeto, '__dict__'):
+            pendentes.extend(vars(objeto).values())
+    return total
+
+# Função para desserializar um artefato medindo tempo de carga e memória
+def _carregar(caminho, mmap_mode):
+    # Importado aqui para que processos que só usam os preditores NumPy não carreguem joblib/sklearn
+    from joblib import load
+
+    mtime_ns = os.stat(caminho).st_mtime_ns
+    inicio = time.perf_counter()
+    modelo = load(caminho, mmap_mode=mmap_mode)
+    return {
+        'modelo': modelo,
+        'caminho': caminho,
+        'mtime_ns': mtime_ns,
+        'mmap_mode': mmap_mode,
+        'tempo_carga_s': time.perf_counter() - inicio,
+        'memoria_mb': memoria_modelo(modelo) / 1024 ** 2,
+    }
+
+# Função para registrar (ou substituir) o artefato de um modelo
+def registrar_modelo(nome, caminho, features=None):
+    with _lock:
+        CAMINHOS_MODELOS[nome] = caminho
+        if features is not None:
+            FEATURES_MODELOS[nome] = list(features)
+        for tipo in ('sklearn', 'numpy', 'tabela'):
+            _carregados.pop((tipo, nome), None)
+
+# Função para obter um modelo pelo nome, carregando uma única vez e recarregando se o arquivo mudar
+def obter_modelo(nome, mmap_mode=MMAP_MODE):
+    caminho = CAMINHOS_MODELOS[nome]
+    mtime_ns = os.stat(caminho).st_mtime_ns
+    entrada = _carregados.get(('sklearn', nome))
+    if entrada is None or entrada['mtime_ns'] != mtime_ns or entrada['mmap_mode'] != mmap_mode:
+        with _lock:
+            entrada = _carregados.get(('sklearn', nome))
+            if entrada is None or entrada['mtime_ns'] != mtime_ns or entrada['mmap_mode'] != mmap_mode:
+                entrada = _carregar(caminho, mmap_mode)
+                _carregados[('sklearn', nome)] = entrada
+    return entrada['modelo']
+
+# Função para derivar o caminho do preditor NumPy (.npz) a partir do artefato do modelo
+def caminho_preditor(nome):
+    return os.path.splitext(CAMINHOS_MODELOS[nome])[0] + '.npz'
+
+# Preditor para os modelos que não podem ser exportados para NumPy (ex.: RandomForest, Pipeline com PCA): delega a
+# previsão ao modelo do sklearn do registro, com a mesma interface de PreditorNumpy
+class PreditorSklearn:
+    def __init__(self, nome, modelo):
+        self.nome = nome
+        self.features = list(FEATURES_MODELOS[nome])
+        self.classes = np.asarray(modelo.classes_)
+        self.parametros = {}
+
+    # Classe prevista para uma linha (1-D) ou várias (2-D), com as features na ordem de self.features
+    def prever(self, X):
+        import pandas as pd
+
+        X = np.asarray(X, dtype=np.float64)
+        previsao = obter_modelo(self.nome).predict(pd.DataFrame(np.atleast_2d(X), columns=self.features))
+        return previsao if X.ndim == 2 else previsao[0]
+
+    # Interface do sklearn, para uso no lugar do modelo na previsão em lote (previsao_lote.py)
+    def predict(self, X):
+        return self.prever(X)
+
+# Função para exportar o modelo do sklearn para NumPy, conferindo a exportação em uma amostra de entradas.
+# Modelos não suportados ou exportações que divergem do sklearn usam o próprio modelo (PreditorSklearn).
+def _exportar_ou_delegar(nome, modelo):
+    try:
+        preditor = PreditorNumpy(exportar_preditor(modelo, FEATURES_MODELOS[nome]))
+        resultado = verificar_equivalencia(modelo, preditor, amostra_entradas(len(preditor.features)))
+        if resultado['divergencias'] > 0:
+            raise ValueError(f"{resultado['divergencias']} divergências em relação ao sklearn "
+                             f"(diferença máxima na decisão {resultado['max_diferenca_decisao']:.2e})")
+    except ValueError as erro:
+        _logger.warning('Modelo %s sem preditor NumPy, usando o sklearn: %s', nome, erro)
+        return PreditorSklearn(nome, modelo)
+    return preditor
+
+# Função para carregar o preditor NumPy de um modelo: usa o .npz quando ele foi exportado do artefato atual
+# e, caso contrário, extrai e confere os parâmetros do modelo carregado pelo sklearn
+def _carregar_preditor(nome, caminho):
+    mtime_ns = os.stat(caminho).st_mtime_ns
+    inicio = time.perf_counter()
+    caminho_npz, preditor = caminho_preditor(nome), None
+    if os.path.exists(caminho_npz):
+        preditor, origem = carregar_preditor(caminho_npz)
+        if origem.get('sha256') != sha256_arquivo(caminho) or preditor.features != FEATURES_MODELOS[nome]:
+            preditor = None
+    if preditor is None:
+        caminho_npz = None
+        preditor = _exportar_ou_delegar(nome, obter_modelo(nome))
+    return {
+        'preditor': preditor,
+        'caminho': caminho_npz or caminho,
+        'mtime_ns': mtime_ns,
+        'mmap_mode': None,
+        'tempo_carga_s': time.perf_counter() - inicio,
+        'memoria_mb': memoria_modelo(preditor.parametros) / 1024 ** 2,
+    }
+
+# Função para obter o preditor NumPy de um modelo (previsões sem o overhead do sklearn), recarregando se o arquivo mudar
+def obter_preditor(nome):
+    caminho = CAMINHOS_MODELOS[nome]
+    mtime_ns = os.stat(caminho).st_mtime_ns
+    entrada = _carregados.get(('numpy', nome))
+    if entrada is None or entrada['mtime_ns'] != mtime_ns:
+        with _lock:
+            entrada = _carregados.get(('numpy', nome))
+            if entrada is None or entrada['mtime_ns'] != mtime_ns:
+                entrada = _carregar_preditor(nome, caminho)
+                _carregados[('numpy', nome)] = entrada
+    return entrada['preditor']
+
+# Função para obter a tabela de previsão (grade 101 x 101) de um modelo de até 2 features,
+# montada uma única vez por versão do artefato (acompanha a recarga do preditor).
+# Modelos sem tabela (mais de 2 features ou mais de 2 classes) são previstos pelo próprio preditor.
+def obter_tabela(nome):
+    preditor = obter_preditor(nome)
+    if len(preditor.features) > 2 or len(preditor.classes) != 2:
+        return preditor
+    tabela = _carregados.get(('tabela', nome))
+    if tabela is None or tabela.preditor is not preditor:
+        with _lock:
+            tabela = _carregados.get(('tabela', nome))
+            if tabela is None or tabela.preditor is not preditor:
+                tabela = TabelaPrevisao(preditor)
+                _carregados[('tabela', nome)] = tabela
+    return tabela
+
+# Função para listar os modelos e preditores NumPy carregados, com tempo de carga e memória
+def info_modelos():
+    return [{'nome': nome, 'tipo': tipo, **{chave: valor for chave, valor in entrada.items()
+                                            if chave not in ('modelo', 'preditor')}}
+            for (tipo, nome), entrada in _carregados.items() if tipo != 'tabela']
+
+# Função para obter o uso do orçamento de memória dos modelos (entradas, memória, descartes)
+def estatisticas_modelos():
+    return _carregados.estatisticas()
+
+# Função para descarregar os modelos (a próxima chamada de obter_modelo recarrega do disco)
+def limpar_registro():
+    with _lock:
+        _carregados.clear()
+
+# Função para gravar o relatório de avaliação dos modelos em JSON
+def salvar_relatorio(relatorio, caminho=CAMINHO_RELATORIO):
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+# Função para ler o relatório de avaliação (None se o treino ainda não foi executado)
+def ler_relatorio(caminho=CAMINHO_RELATORIO):
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
@@ -0,0 +1,127 @@
+import csv
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+# Perfilamento das etapas do pipeline, ativado pela variável de ambiente PASSOS_MAGICOS_PERFILAMENTO=1.
+# Desativado, o decorador devolve a própria função, sem nenhum custo adicional.
+PERFILAMENTO_ATIVO = os.environ.get('PASSOS_MAGICOS_PERFILAMENTO', '').lower() not in ('', '0', 'false')
+
+# Quantidade máxima de registros mantidos em memória
+MAX_REGISTROS = 5_000
+
+CAMPOS_REGISTRO = ['execucao', 'nivel', 'etapa', 'inicio', 'tempo_s', 'pico_memoria_mb',
+                   'linhas_entrada', 'colunas_entrada', 'linhas_saida', 'colunas_saida']
+
+_registros = deque(maxlen=MAX_REGISTROS)
+_contador_execucoes = itertools.count(1)
+_lock = threading.Lock()
+_local = threading.local()
+
+# Função para obter (linhas, colunas) de um DataFrame, ou (None, None) para outros objetos
+def _formato(objeto):
+    formato = getattr(objeto, 'shape', None)
+    if formato is not None and len(formato) == 2:
+        return int(formato[0]), int(formato[1])
+    return None, None
+
+# Atualiza o pico observado pelas etapas externas antes de zerar o pico do tracemalloc
+def _propagar_pico(pilha):
+    _, pico = tracemalloc.get_traced_memory()
+    for quadro in pilha:
+        quadro['pico'] = max(quadro['pico'], pico)
+
+# Decorador que registra tempo, pico de memória e formato de entrada/saída de uma etapa
+def medir_etapa(func):
+    if not PERFILAMENTO_ATIVO:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # tracemalloc é global ao processo: mede apenas uma etapa por vez e deixa as demais threads passarem
+        pilha = getattr(_local, 'pilha', None)
+        if pilha is None:
+            if not _lock.acquire(blocking=False):
+                return func(*args, **kwargs)
+            pilha = _local.pilha = []
+            iniciou_tracemalloc = not tracemalloc.is_tracing()
+            if iniciou_tracemalloc:
+                tracemalloc.start()
+            execucao = next(_contador_execucoes)
+        else:
+            execucao = pilha[0]['execucao']
+
+        _propagar_pico(pilha)
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        quadro = {'execucao': execucao, 'base': base, 'pico': base}
+        pilha.append(quadro)
+
+        linhas_entrada, colunas_entrada = _formato(args[0] if args else None)
+        inicio_relogio, inicio = time.time(), time.perf_counter()
+        try:
+            resultado = func(*args, **kwargs)
+        finally:
+            tempo = time.perf_counter() - inicio
+            _propagar_pico(pilha)
+            pilha.pop()
+            if not pilha:
+                if iniciou_tracemalloc:
+                    tracemalloc.stop()
+                _local.pilha = None
+                _lock.release()
+
+        linhas_entrada, colunas_entrada = quadro.get('formato_entrada', (linhas_entrada, colunas_entrada))
+        linhas_saida, colunas_saida = quadro.get('formato_saida', _formato(resultado))
+        _registros.append({
+            'execucao': execucao,
+            'nivel': len(pilha),
+            'etapa': func.__name__,
+            'inicio': inicio_relogio,
+            'tempo_s': tempo,
+            'pico_memoria_mb': (quadro['pico'] - quadro['base']) / 1024 ** 2,
+            'linhas_entrada': linhas_entrada,
+            'colunas_entrada': colunas_entrada,
+            'linhas_saida': linhas_saida,
+            'colunas_saida': colunas_saida,
+        })
+        return resultado
+
+    return wrapper
+
+# Função para informar o formato (linhas, colunas) de entrada e/ou de saída da etapa em execução, quando não é o de um
+# DataFrame (ex.: as fases do pipeline fundido, que recebem e devolvem listas de blocos). Sem efeito fora de uma etapa medida.
+def informar_formato(entrada=None, saida=None):
+    pilha = getattr(_local, 'pilha', None)
+    if not pilha:
+        return
+    if entrada is not None:
+        pilha[-1]['formato_entrada'] = tuple(int(valor) for valor in entrada)
+    if saida is not None:
+        pilha[-1]['formato_saida'] = tuple(int(valor) for valor in saida)
+
+# Função para listar os registros de perfilamento (do mais antigo para o mais recente)
+def registros_perfilamento():
+    return list(_registros)
+
+# Função para descartar os registros acumulados
+def limpar_registros():
+    _registros.clear()
+
+# Função para exportar os registros como JSON ou CSV (pela extensão do arquivo)
+def exportar_trace(caminho):
+    registros = registros_perfilamento()
+    if caminho.endswith('.csv'):
+        with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+            escritor = csv.DictWriter(arquivo, fieldnames=CAMPOS_REGISTRO)
+            escritor.writeheader()
+            escritor.writerows(registros)
+    else:
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump(registros, arquivo, ensure_ascii=False, indent=2)
+    return len(registros)
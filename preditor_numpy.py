@@ -0,0 +1,232 @@
+import hashlib
+import json
+
+import numpy as np
+
+# Previsão dos SVMs apenas com NumPy, a partir dos parâmetros extraídos do modelo treinado.
+# Evita a criação do DataFrame, a validação dos nomes das features e o dispatch do sklearn em cada previsão,
+# e permite servir os modelos sem importar o sklearn (o artefato .npz só depende do NumPy).
+
+# Kernels suportados (mesmas fórmulas do libsvm)
+KERNELS = ('linear', 'rbf', 'poly', 'sigmoid')
+
+# Função para extrair a transformação afim (x * escala + deslocamento) de um scaler do sklearn.
+# Apenas os scalers afins conhecidos são aceitos; qualquer outra etapa (ex.: PCA) gera erro em vez de ser ignorada.
+def _parametros_scaler(scaler, n_features):
+    from sklearn.preprocessing import MaxAbsScaler, MinMaxScaler, RobustScaler, StandardScaler
+
+    uns, zeros = np.ones(n_features), np.zeros(n_features)
+    if isinstance(scaler, StandardScaler):
+        # (x - mean_) / scale_ (com with_mean/with_std desligados os atributos são None)
+        centro = scaler.mean_ if scaler.mean_ is not None else zeros
+        desvio = scaler.scale_ if scaler.scale_ is not None else uns
+    elif isinstance(scaler, RobustScaler):
+        # (x - center_) / scale_ (com with_centering/with_scaling desligados os atributos são None)
+        centro = scaler.center_ if scaler.center_ is not None else zeros
+        desvio = scaler.scale_ if scaler.scale_ is not None else uns
+    elif isinstance(scaler, MaxAbsScaler):
+        # x / scale_
+        centro, desvio = zeros, scaler.scale_
+    elif isinstance(scaler, MinMaxScaler):
+        # x * scale_ + min_ (com clip=True a transformação deixa de ser afim)
+        if scaler.clip:
+            raise ValueError('MinMaxScaler com clip=True não é suportado')
+        return np.asarray(scaler.scale_, dtype=np.float64), np.asarray(scaler.min_, dtype=np.float64)
+    else:
+        raise ValueError(f'Etapa não suportada no pipeline: {type(scaler).__name__}')
+    desvio = np.asarray(desvio, dtype=np.float64)
+    return 1 / desvio, -np.asarray(centro, dtype=np.float64) / desvio
+
+# Função para extrair os parâmetros de um SVC binário (ou de um Pipeline de scalers terminando em SVC)
+def exportar_preditor(modelo, features):
+    n_features = len(features)
+    escala, deslocamento = np.ones(n_features), np.zeros(n_features)
+    if hasattr(modelo, 'steps'):
+        # Compõe as transformações afins das etapas anteriores ao estimador
+        for _, etapa in modelo.steps[:-1]:
+            if etapa is None or etapa == 'passthrough':
+                continue
+            escala_etapa, deslocamento_etapa = _parametros_scaler(etapa, n_features)
+            escala, deslocamento = escala * escala_etapa, deslocamento * escala_etapa + deslocamento_etapa
+        modelo = modelo.steps[-1][1]
+
+    from sklearn.svm import SVC, NuSVC
+
+    if not isinstance(modelo, (SVC, NuSVC)) or modelo.kernel not in KERNELS:
+        raise ValueError(f'Modelo não suportado: {type(modelo).__name__} (kernel {getattr(modelo, "kernel", None)})')
+    if len(modelo.classes_) != 2:
+        raise ValueError('Apenas classificadores binários são suportados')
+    if modelo.support_vectors_.shape[1] != n_features:
+        raise ValueError(f'O modelo espera {modelo.support_vectors_.shape[1]} features, recebeu {n_features}')
+
+    parametros = {
+        'features': np.array(features),
+        'kernel': np.array(modelo.kernel),
+        'gamma': np.float64(modelo._gamma),
+        'coef0': np.float64(modelo.coef0),
+        'degree': np.int64(modelo.degree),
+        'classes': np.asarray(modelo.classes_),
+        'intercepto': np.float64(modelo.intercept_[0]),
+        'escala': escala,
+        'deslocamento': deslocamento,
+    }
+    if modelo.kernel == 'linear':
+        # Kernel linear: os vetores de suporte se reduzem a um único vetor de pesos, já combinado com o scaler
+        pesos = (modelo.dual_coef_ @ modelo.support_vectors_).ravel()
+        parametros['pesos'] = pesos * escala
+        parametros['intercepto'] = np.float64(parametros['intercepto'] + pesos @ deslocamento)
+    else:
+        parametros['vetores_suporte'] = np.asarray(modelo.support_vectors_, dtype=np.float64)
+        parametros['coef_dual'] = np.asarray(modelo.dual_coef_[0], dtype=np.float64)
+    return parametros
+
+# Função para gravar os parâmetros em .npz (metadados de origem como JSON)
+def salvar_preditor(parametros, caminho, origem=None):
+    np.savez(caminho, origem=np.array(json.dumps(origem or {})), **parametros)
+
+# Função para ler os parâmetros e os metadados de origem de um .npz
+def carregar_preditor(caminho):
+    with np.load(caminho, allow_pickle=False) as arquivo:
+        parametros = {chave: arquivo[chave] for chave in arquivo.files}
+    origem = json.loads(str(parametros.pop('origem', '{}')))
+    return PreditorNumpy(parametros), origem
+
+# Função para calcular o hash do artefato de origem (gravado no .npz para detectar exportações desatualizadas)
+def sha256_arquivo(caminho):
+    with open(caminho, 'rb') as arquivo:
+        return hashlib.sha256(arquivo.read()).hexdigest()
+
+# Função para exportar o artefato .joblib de um modelo para .npz
+def exportar_arquivo(caminho_modelo, features, caminho_npz):
+    from joblib import load
+
+    modelo = load(caminho_modelo)
+    parametros = exportar_preditor(modelo, features)
+    salvar_preditor(parametros, caminho_npz, {'arquivo': caminho_modelo, 'sha256': sha256_arquivo(caminho_modelo)})
+    return modelo, PreditorNumpy(parametros)
+
+# Função de decisão do SVM (equivalente a decision_function) e previsão da classe
+class PreditorNumpy:
+    def __init__(self, parametros):
+        self.parametros = parametros
+        self.features = [str(feature) for feature in parametros['features']]
+        self.kernel = str(parametros['kernel'])
+        self.classes = parametros['classes']
+        self.intercepto = float(parametros['intercepto'])
+        self.pesos = parametros.get('pesos')
+        if self.kernel != 'linear':
+            self.escala, self.deslocamento = parametros['escala'], parametros['deslocamento']
+            self.vetores_suporte, self.coef_dual = parametros['vetores_suporte'], parametros['coef_dual']
+            self.gamma, self.coef0, self.degree = (float(parametros['gamma']), float(parametros['coef0']),
+                                                   int(parametros['degree']))
+            self.normas_suporte = (self.vetores_suporte ** 2).sum(axis=1)
+
+    def _kernel(self, X):
+        produto = X @ self.vetores_suporte.T
+        if self.kernel == 'rbf':
+            distancias = (X ** 2).sum(axis=1)[:, None] - 2 * produto + self.normas_suporte
+            return np.exp(-self.gamma * np.maximum(distancias, 0))
+        if self.kernel == 'poly':
+            return (self.gamma * produto + self.coef0) ** self.degree
+        return np.tanh(self.gamma * produto + self.coef0)
+
+    # Valor da função de decisão para uma linha (1-D) ou várias (2-D), com as features na ordem de self.features
+    def decisao(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if self.kernel == 'linear':
+            return X @ self.pesos + self.intercepto
+        linhas = np.atleast_2d(X) * self.escala + self.deslocamento
+        resultado = self._kernel(linhas) @ self.coef_dual + self.intercepto
+        return resultado if X.ndim == 2 else resultado[0]
+
+    # Classe prevista (mesma convenção do sklearn: classes[1] quando a decisão é positiva)
+    def prever(self, X):
+        return self.classes[(np.asarray(self.decisao(X)) > 0).astype(np.intp)]
+
+# Função para gerar uma grade densa de entradas: grade completa para até 2 features, grade grossa + pontos
+# aleatórios para mais features (a grade completa de 8 indicadores com passo 0,1 teria 101^8 pontos)
+def grade_entradas(n_features, passo=0.1, n_aleatorios=200_000, limites=(0.0, 10.0), seed=55):
+    if n_features <= 2:
+        eixo = np.round(np.arange(limites[0], limites[1] + passo / 2, passo), 10)
+        return np.stack(np.meshgrid(*[eixo] * n_features, indexing='ij'), axis=-1).reshape(-1, n_features)
+    eixo = np.linspace(*limites, 5)
+    grade = np.stack(np.meshgrid(*[eixo] * n_features, indexing='ij'), axis=-1).reshape(-1, n_features)
+    aleatorios = np.random.default_rng(seed).uniform(*limites, size=(n_aleatorios, n_features)).round(2)
+    return np.vstack([grade, aleatorios])
+
+# Função para sortear entradas com o passo dos campos do app (amostra usada para conferir uma exportação na carga)
+def amostra_entradas(n_features, n_pontos=2_000, passo=0.1, limites=(0.0, 10.0), seed=55):
+    pontos = np.random.default_rng(seed).uniform(*limites, size=(n_pontos, n_features))
+    return np.round(np.round(pontos / passo) * passo, 10)
+
+# Função para comparar o preditor com o modelo do sklearn sobre uma grade de entradas.
+# Pontos com |decisão| abaixo da tolerância estão sobre a fronteira e podem divergir por arredondamento.
+def verificar_equivalencia(modelo, preditor, X, tolerancia=1e-8):
+    import pandas as pd
+
+    dados = pd.DataFrame(X, columns=preditor.features)
+    decisao_sklearn = modelo.decision_function(dados)
+    decisao_numpy = preditor.decisao(X)
+    divergentes = modelo.predict(dados) != preditor.prever(X)
+    fronteira = np.abs(decisao_sklearn) <= tolerancia
+    return {
+        'pontos': len(X),
+        'max_diferenca_decisao': float(np.abs(decisao_sklearn - decisao_numpy).max()),
+        'divergencias': int((divergentes & ~fronteira).sum()),
+        'divergencias_na_fronteira': int((divergentes & fronteira).sum()),
+    }
+
+if __name__ == '__main__':
+    import argparse
+    import os
+    import time
+
+    import pandas as pd
+    from joblib import load
+
+    from modelos import CAMINHOS_MODELOS, FEATURES_MODELOS, caminho_preditor
+
+    parser = argparse.ArgumentParser(description='Verifica a equivalência dos .npz com os SVMs do sklearn (somente leitura)')
+    parser.add_argument('--passo', type=float, default=0.1, help='Passo da grade de entradas')
+    parser.add_argument('--repeticoes', type=int, default=2_000, help='Repetições na medição da previsão de uma linha')
+    parser.add_argument('--exportar', action='store_true',
+                        help='Reexporta os .npz a partir dos .joblib (gravados apenas se não houver divergências)')
+    args = parser.parse_args()
+
+    falhou = False
+    for nome, caminho in CAMINHOS_MODELOS.items():
+        modelo, caminho_npz = load(caminho), caminho_preditor(nome)
+        if args.exportar:
+            parametros = exportar_preditor(modelo, FEATURES_MODELOS[nome])
+            preditor = PreditorNumpy(parametros)
+        elif not os.path.exists(caminho_npz):
+            print(f'{nome}: {caminho_npz} não encontrado (use --exportar)')
+            falhou = True
+            continue
+        else:
+            preditor, origem = carregar_preditor(caminho_npz)
+            if origem.get('sha256') != sha256_arquivo(caminho):
+                print(f'{nome}: {caminho_npz} foi exportado de outra versão de {caminho} (use --exportar)')
+                falhou = True
+        resultado = verificar_equivalencia(modelo, preditor, grade_entradas(len(preditor.features), args.passo))
+        falhou = falhou or resultado['divergencias'] > 0
+        if args.exportar and resultado['divergencias'] == 0:
+            salvar_preditor(parametros, caminho_npz, {'arquivo': caminho, 'sha256': sha256_arquivo(caminho)})
+
+        # Previsão de uma linha, como no app: DataFrame + predict x array + PreditorNumpy
+        linha = np.full(len(preditor.features), 5.0)
+        dados = pd.DataFrame([linha], columns=preditor.features)
+        inicio = time.perf_counter()
+        for _ in range(args.repeticoes):
+            modelo.predict(dados)
+        tempo_sklearn = (time.perf_counter() - inicio) / args.repeticoes
+        inicio = time.perf_counter()
+        for _ in range(args.repeticoes):
+            preditor.prever(linha)
+        tempo_numpy = (time.perf_counter() - inicio) / args.repeticoes
+
+        destino = f" -> {caminho_npz}" if args.exportar and resultado['divergencias'] == 0 else ''
+        print(f"{nome}: {resultado['pontos']} pontos, diferença máxima na decisão {resultado['max_diferenca_decisao']:.2e}, "
+              f"{resultado['divergencias']} divergências ({resultado['divergencias_na_fronteira']} sobre a fronteira); "
+              f'uma linha: sklearn {tempo_sklearn * 1e6:.0f} µs x NumPy {tempo_numpy * 1e6:.1f} µs{destino}')
+    raise SystemExit(1 if falhou else 0)
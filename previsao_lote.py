@@ -0,0 +1,85 @@
+import time
+
+import pandas as pd
+
+from modelos import CAMINHOS_MODELOS, FEATURES_MODELOS, obter_modelo, obter_tabela, registrar_modelo
+
+# Ordem das features usada no treino de cada modelo
+FEATURES_PV = FEATURES_MODELOS['ponto_virada']
+FEATURES_BOLSA = FEATURES_MODELOS['bolsa']
+
+# Colunas de saída com as previsões
+COLUNA_PREVISAO_PV = 'PREVISAO_PONTO_VIRADA'
+COLUNA_PREVISAO_BOLSA = 'PREVISAO_INDICADO_BOLSA'
+
+# Função para detectar o separador do CSV (';' como na base PEDE, ou ',')
+def detectar_separador(primeira_linha):
+    return ';' if primeira_linha.count(';') >= primeira_linha.count(',') else ','
+
+# Função para aplicar um modelo às linhas completas de um bloco (linhas com indicador faltando ficam sem previsão)
+def _prever_bloco(modelo, df, features):
+    previsao = pd.Series(pd.NA, index=df.index, dtype='Int8')
+    dados = df[features].apply(pd.to_numeric, errors='coerce')
+    completas = dados.notna().all(axis=1)
+    if completas.any():
+        previsao[completas] = modelo.predict(dados[completas])
+    return previsao
+
+# Função para prever ponto de virada e indicação de bolsa para um bloco de alunos
+def prever_alunos(df, modelo_pv, modelo_bolsa):
+    df = df.copy()
+    if set(FEATURES_PV).issubset(df.columns):
+        df[COLUNA_PREVISAO_PV] = _prever_bloco(modelo_pv, df, FEATURES_PV)
+    if set(FEATURES_BOLSA).issubset(df.columns):
+        df[COLUNA_PREVISAO_BOLSA] = _prever_bloco(modelo_bolsa, df, FEATURES_BOLSA)
+    return df
+
+# Função para validar se o arquivo tem as colunas de pelo menos um dos modelos
+def validar_colunas(colunas):
+    if not set(FEATURES_PV).issubset(colunas) and not set(FEATURES_BOLSA).issubset(colunas):
+        faltando = [col for col in FEATURES_PV if col not in colunas]
+        raise ValueError(f'Colunas obrigatórias ausentes: {", ".join(faltando)}')
+
+# Função para prever um DataFrame inteiro em blocos vetorizados, gerando os blocos já com as previsões
+def prever_em_blocos(df, modelo_pv, modelo_bolsa, chunksize=10_000):
+    validar_colunas(df.columns)
+    if df.empty:
+        raise ValueError('O arquivo não tem nenhum aluno (apenas o cabeçalho).')
+    for inicio in range(0, len(df), chunksize):
+        yield prever_alunos(df.iloc[inicio:inicio + chunksize], modelo_pv, modelo_bolsa)
+
+# Função para prever um arquivo CSV em blocos, gravando o resultado incrementalmente
+def prever_arquivo(caminho_entrada, caminho_saida, modelo_pv, modelo_bolsa, chunksize=10_000, sep=None):
+    if sep is None:
+        with open(caminho_entrada, encoding='utf-8') as arquivo:
+            sep = detectar_separador(arquivo.readline())
+
+    inicio, total = time.perf_counter(), 0
+    for i, bloco in enumerate(pd.read_csv(caminho_entrada, sep=sep, chunksize=chunksize)):
+        if i == 0:
+            validar_colunas(bloco.columns)
+        resultado = prever_alunos(bloco, modelo_pv, modelo_bolsa)
+        resultado.to_csv(caminho_saida, sep=sep, index=False, mode='w' if i == 0 else 'a', header=i == 0)
+        total += len(bloco)
+
+    tempo = time.perf_counter() - inicio
+    return {'linhas': total, 'tempo_s': tempo, 'linhas_por_s': total / tempo if tempo else 0.0}
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Previsão em lote de Ponto de Virada e Indicação de Bolsa')
+    parser.add_argument('entrada', help='CSV com as colunas INDE, IAA, IEG, IPS, IDA, IPP, IPV e IAN')
+    parser.add_argument('saida', help='CSV de saída com as colunas de previsão')
+    parser.add_argument('--chunksize', type=int, default=10_000)
+    parser.add_argument('--sep', default=None, help='Separador do CSV (detectado automaticamente se omitido)')
+    parser.add_argument('--modelo-pv', default=CAMINHOS_MODELOS['ponto_virada'])
+    parser.add_argument('--modelo-bolsa', default=CAMINHOS_MODELOS['bolsa'])
+    args = parser.parse_args()
+
+    registrar_modelo('ponto_virada', args.modelo_pv)
+    registrar_modelo('bolsa', args.modelo_bolsa)
+    relatorio = prever_arquivo(args.entrada, args.saida, obter_modelo('ponto_virada'), obter_tabela('bolsa'),
+                               chunksize=args.chunksize, sep=args.sep)
+    print(f"{relatorio['linhas']} linhas em {relatorio['tempo_s']:.2f} s "
+          f"({relatorio['linhas_por_s']:.0f} linhas/s) -> {args.saida}")
@@ -0,0 +1,124 @@
+import re
+
+import pandas as pd
+
+from tratamento_dados import COLUNAS_INDICADORES, VALORES_INDESEJADOS
+
+# Indicadores do aluno (COLUNAS_INDICADORES, notas de 0 a 10 com duas casas decimais), armazenados como float32
+FAIXA_INDICADORES = (0.0, 10.0)
+
+# Rótulos aceitos em cada coluna categórica de domínio fechado.
+# As categorias seguem a ordem alfabética, a mesma de astype('category'), para não mudar a ordem dos gráficos.
+ROTULOS = {
+    'PEDRA': sorted(['Quartzo', 'Ágata', 'Ametista', 'Topázio']),
+    'PONTO_VIRADA': ['Não', 'Sim'],
+    'INDICADO_BOLSA': ['Não', 'Sim'],
+}
+
+# Colunas categóricas de domínio aberto (categorias definidas pelos próprios dados)
+COLUNAS_CATEGORICAS = ['NOME', 'ANO', 'TURMA']
+
+# Colunas que podem ter nulos na base tratada (restauradas após drop_null_columns)
+COLUNAS_OPCIONAIS = ['PONTO_VIRADA', 'INDICADO_BOLSA']
+
+PADRAO_ANO = re.compile(r'^\d{4}$')
+FAIXA_FASE = (0, 9)
+
+# Função para converter a base tratada para o esquema compacto, validando os valores antes da conversão
+def tipar_base(df, colunas_indicadores=COLUNAS_INDICADORES):
+    validar_base(df, colunas_indicadores)
+    df = df.copy()
+    for col in df.columns:
+        if col in ROTULOS:
+            df[col] = df[col].astype(pd.CategoricalDtype(ROTULOS[col]))
+        elif col in COLUNAS_CATEGORICAS:
+            # Nomes e turmas repetidos a cada ano viram códigos inteiros apontando para um único valor
+            df[col] = df[col].astype('category')
+    # FASE mistura texto (2020, extraída de FASE_TURMA) e número (2021+): unifica como inteiro
+    if 'FASE' in df.columns:
+        df['FASE'] = pd.to_numeric(df['FASE'], errors='coerce').astype('Int8')
+    colunas = [col for col in colunas_indicadores if col in df.columns]
+    df[colunas] = df[colunas].astype('float32')
+    return df
+
+# Função para listar os problemas de esquema da base (lista vazia quando a base é válida)
+def problemas_schema(df, colunas_indicadores=COLUNAS_INDICADORES):
+    problemas = []
+    obrigatorias = ['NOME', 'ANO', 'FASE', 'PEDRA'] + list(colunas_indicadores)
+    faltando = [col for col in obrigatorias if col not in df.columns]
+    if faltando:
+        problemas.append(f'colunas ausentes: {", ".join(faltando)}')
+
+    for col in df.columns:
+        valores = df[col]
+        if col not in COLUNAS_OPCIONAIS and valores.isna().any():
+            problemas.append(f'{col}: {int(valores.isna().sum())} valores nulos')
+
+        if col in ROTULOS:
+            invalidos = set(valores.dropna().unique()) - set(ROTULOS[col])
+            if invalidos:
+                problemas.append(f'{col}: valores fora do domínio {sorted(map(str, invalidos))}')
+        elif col == 'ANO':
+            invalidos = [ano for ano in valores.dropna().unique() if not PADRAO_ANO.match(str(ano))]
+            if invalidos:
+                problemas.append(f'ANO: valores inválidos {sorted(map(str, invalidos))}')
+        elif col == 'FASE':
+            fase = pd.to_numeric(valores, errors='coerce')
+            fora = valores.notna() & (fase.isna() | (fase % 1 != 0) | ~fase.between(*FAIXA_FASE))
+            if fora.any():
+                problemas.append(f'FASE: {int(fora.sum())} valores fora de {FAIXA_FASE}')
+        elif col in colunas_indicadores:
+            if not pd.api.types.is_numeric_dtype(valores):
+                problemas.append(f'{col}: tipo {valores.dtype} não numérico')
+            elif (~valores.dropna().between(*FAIXA_INDICADORES)).any():
+                problemas.append(f'{col}: valores fora de {FAIXA_INDICADORES}')
+    return problemas
+
+# Função para validar a base, levantando ValueError com todos os problemas encontrados
+def validar_base(df, colunas_indicadores=COLUNAS_INDICADORES):
+    problemas = problemas_schema(df, colunas_indicadores)
+    if problemas:
+        raise ValueError('Base fora do esquema: ' + '; '.join(problemas))
+
+# Função para verificar se a base já está no esquema compacto (tipos gravados no snapshot)
+def base_tipada(df, colunas_indicadores=COLUNAS_INDICADORES):
+    for col in df.columns:
+        tipo = df[col].dtype
+        if col in ROTULOS:
+            if not isinstance(tipo, pd.CategoricalDtype) or list(tipo.categories) != ROTULOS[col]:
+                return False
+        elif col in COLUNAS_CATEGORICAS and not isinstance(tipo, pd.CategoricalDtype):
+            return False
+        elif col == 'FASE' and str(tipo) != 'Int8':
+            return False
+        elif col in colunas_indicadores and str(tipo) != 'float32':
+            return False
+    return True
+
+# Função para medir a memória ocupada por coluna (em bytes, incluindo o conteúdo das strings)
+def relatorio_memoria(df):
+    uso = df.memory_usage(deep=True, index=False)
+    return pd.DataFrame({'tipo': df.dtypes.astype(str), 'bytes': uso})
+
+# Função para comparar a memória da base antes e depois da tipagem
+def comparar_memoria(df_original, df_tipado):
+    comparacao = relatorio_memoria(df_original).join(relatorio_memoria(df_tipado), lsuffix='_original', rsuffix='_tipado')
+    comparacao.loc['TOTAL'] = ['', comparacao['bytes_original'].sum(), '', comparacao['bytes_tipado'].sum()]
+    comparacao['reducao'] = 1 - comparacao['bytes_tipado'] / comparacao['bytes_original']
+    return comparacao
+
+if __name__ == '__main__':
+    import argparse
+
+    from leitura_dados import ler_base_passos_magicos
+    from tratamento_dados import pipeline_passos_magicos_fundido
+
+    parser = argparse.ArgumentParser(description='Valida a base tratada e mostra a memória ocupada antes e depois da tipagem')
+    parser.add_argument('caminho_csv', nargs='?', default='PEDE_PASSOS_DATASET_FIAP.csv')
+    parser.add_argument('--anos', nargs='+', default=['2020', '2021', '2022'])
+    args = parser.parse_args()
+
+    df = pipeline_passos_magicos_fundido(ler_base_passos_magicos(args.caminho_csv, args.anos), args.anos,
+                                         COLUNAS_INDICADORES, VALORES_INDESEJADOS)
+    comparacao = comparar_memoria(df, tipar_base(df))
+    print(comparacao.to_string(formatters={'reducao': '{:.0%}'.format}))
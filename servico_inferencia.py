@@ -0,0 +1,161 @@
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import numpy as np
+from fastapi import FastAPI
+from pydantic import BaseModel, Field
+
+from modelos import FEATURES_MODELOS, obter_preditor, obter_tabela
+
+# Configuração do micro-batching (sobrescrita por variáveis de ambiente ou pela CLI)
+MAX_TAMANHO_LOTE = int(os.environ.get('PASSOS_MAGICOS_MAX_LOTE', 64))
+MAX_ESPERA_MS = float(os.environ.get('PASSOS_MAGICOS_MAX_ESPERA_MS', 5))
+
+# Quantidade de latências guardadas por endpoint para o cálculo dos percentis
+JANELA_METRICAS = 10_000
+
+# Entradas dos endpoints (mesmos limites dos campos do app)
+class IndicadoresPontoVirada(BaseModel):
+    INDE: float = Field(ge=0, le=10)
+    IAA: float = Field(ge=0, le=10)
+    IEG: float = Field(ge=0, le=10)
+    IPS: float = Field(ge=0, le=10)
+    IDA: float = Field(ge=0, le=10)
+    IPP: float = Field(ge=0, le=10)
+    IPV: float = Field(ge=0, le=10)
+    IAN: float = Field(ge=0, le=10)
+
+class IndicadoresBolsa(BaseModel):
+    IPV: float = Field(ge=0, le=10)
+    IPP: float = Field(ge=0, le=10)
+
+# Agrupa requisições concorrentes de um modelo em lotes antes de chamar o predict
+class MicroLote:
+    def __init__(self, nome_modelo, max_tamanho_lote, max_espera_ms):
+        self.nome_modelo = nome_modelo
+        self.features = FEATURES_MODELOS[nome_modelo]
+        self.max_tamanho_lote = max_tamanho_lote
+        self.max_espera_s = max_espera_ms / 1000
+        self.fila = asyncio.Queue()
+        self.tamanhos_lote = deque(maxlen=JANELA_METRICAS)
+        self._tarefa = None
+
+    def iniciar(self):
+        self._tarefa = asyncio.create_task(self._processar())
+
+    async def parar(self):
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+
+    async def prever(self, linha):
+        futuro = asyncio.get_running_loop().create_future()
+        await self.fila.put((linha, futuro))
+        return await futuro
+
+    async def _coletar_lote(self):
+        lote = [await self.fila.get()]
+        prazo = time.perf_counter() + self.max_espera_s
+        while len(lote) < self.max_tamanho_lote:
+            restante = prazo - time.perf_counter()
+            if restante <= 0:
+                break
+            try:
+                lote.append(await asyncio.wait_for(self.fila.get(), restante))
+            except asyncio.TimeoutError:
+                break
+        return lote
+
+    def _prever_lote(self, linhas):
+        # Modelos de até 2 features (bolsa) são consultados na tabela pré-calculada sobre a grade
+        if len(self.features) <= 2:
+            return obter_tabela(self.nome_modelo).prever(np.array(linhas))
+        return obter_preditor(self.nome_modelo).prever(np.array(linhas))
+
+    async def _processar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = await self._coletar_lote()
+            self.tamanhos_lote.append(len(lote))
+            try:
+                # O predict roda fora do event loop para não bloquear as requisições que estão chegando
+                previsoes = await loop.run_in_executor(None, self._prever_lote, [linha for linha, _ in lote])
+            except Exception as erro:
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(erro)
+            else:
+                for (_, futuro), previsao in zip(lote, previsoes):
+                    if not futuro.done():
+                        futuro.set_result(int(previsao))
+
+# Latências (em ms) por endpoint
+latencias = {'ponto_virada': deque(maxlen=JANELA_METRICAS), 'bolsa': deque(maxlen=JANELA_METRICAS)}
+lotes = {}
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    for nome in latencias:
+        # Carrega os modelos (e a tabela do modelo de bolsa) antes da primeira requisição
+        obter_tabela(nome) if len(FEATURES_MODELOS[nome]) <= 2 else obter_preditor(nome)
+        lotes[nome] = MicroLote(nome, MAX_TAMANHO_LOTE, MAX_ESPERA_MS)
+        lotes[nome].iniciar()
+    yield
+    for lote in lotes.values():
+        await lote.parar()
+
+app = FastAPI(title='Passos Mágicos - Inferência', lifespan=ciclo_de_vida)
+
+# Função para prever uma linha de um modelo, registrando a latência
+async def _prever(nome_modelo, indicadores):
+    inicio = time.perf_counter()
+    linha = [getattr(indicadores, col) for col in FEATURES_MODELOS[nome_modelo]]
+    previsao = await lotes[nome_modelo].prever(linha)
+    latencias[nome_modelo].append((time.perf_counter() - inicio) * 1000)
+    return {'previsao': previsao}
+
+@app.post('/prever/ponto-virada')
+async def prever_ponto_virada(indicadores: IndicadoresPontoVirada):
+    return await _prever('ponto_virada', indicadores)
+
+@app.post('/prever/bolsa')
+async def prever_bolsa(indicadores: IndicadoresBolsa):
+    return await _prever('bolsa', indicadores)
+
+@app.get('/saude')
+async def saude():
+    return {'status': 'ok'}
+
+@app.get('/metricas')
+async def metricas():
+    resultado = {}
+    for nome, valores in latencias.items():
+        amostra = np.array(valores)
+        tamanhos = np.array(lotes[nome].tamanhos_lote) if nome in lotes else np.array([])
+        resultado[nome] = {
+            'requisicoes': len(amostra),
+            'p50_ms': float(np.percentile(amostra, 50)) if len(amostra) else None,
+            'p99_ms': float(np.percentile(amostra, 99)) if len(amostra) else None,
+            'tamanho_medio_lote': float(tamanhos.mean()) if len(tamanhos) else None,
+        }
+    return {'max_tamanho_lote': MAX_TAMANHO_LOTE, 'max_espera_ms': MAX_ESPERA_MS, 'modelos': resultado}
+
+if __name__ == '__main__':
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Serviço HTTP de inferência dos modelos SVM')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--porta', type=int, default=8000)
+    parser.add_argument('--max-lote', type=int, default=MAX_TAMANHO_LOTE)
+    parser.add_argument('--max-espera-ms', type=float, default=MAX_ESPERA_MS)
+    args = parser.parse_args()
+
+    MAX_TAMANHO_LOTE, MAX_ESPERA_MS = args.max_lote, args.max_espera_ms
+    uvicorn.run(app, host=args.host, port=args.porta)
@@ -0,0 +1,110 @@
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from leitura_dados import ler_base_passos_magicos
+from schema_dados import base_tipada, problemas_schema, relatorio_memoria, tipar_base
+from tratamento_dados import COLUNAS_INDICADORES, VALORES_INDESEJADOS, assinatura_arquivo, pipeline_passos_magicos_fundido
+
+# Versão do formato do snapshot (incrementar quando a tipagem mudar)
+VERSAO_SNAPSHOT = 2
+
+# Chave dos metadados gravados no schema do arquivo Feather
+CHAVE_METADADOS = b'passos_magicos'
+
+# Função para derivar o caminho do snapshot a partir do CSV de origem
+def caminho_snapshot(caminho_csv):
+    return os.path.splitext(caminho_csv)[0] + '.feather'
+
+# Função para gravar a base tratada como snapshot colunar (Feather sem compressão, para permitir memory-map)
+def salvar_snapshot(df, caminho, metadados):
+    tabela = pa.Table.from_pandas(df, preserve_index=True)
+    metadados_schema = dict(tabela.schema.metadata or {})
+    metadados_schema[CHAVE_METADADOS] = json.dumps({**metadados, 'versao': VERSAO_SNAPSHOT}).encode('utf-8')
+    tabela = tabela.replace_schema_metadata(metadados_schema)
+
+    # Grava em arquivo temporário e renomeia, para que leitores concorrentes nunca vejam um arquivo parcial
+    caminho_temp = f'{caminho}.{os.getpid()}.tmp'
+    feather.write_feather(tabela, caminho_temp, compression='uncompressed')
+    os.replace(caminho_temp, caminho)
+
+# Função para ler os metadados do snapshot sem carregar os dados
+def ler_metadados_snapshot(caminho):
+    if not os.path.exists(caminho):
+        return None
+    try:
+        with pa.memory_map(caminho, 'r') as arquivo:
+            schema = pa.ipc.open_file(arquivo).schema
+    except (pa.ArrowInvalid, OSError):
+        return None
+    bruto = (schema.metadata or {}).get(CHAVE_METADADOS)
+    return json.loads(bruto) if bruto else None
+
+# Função para verificar se o snapshot corresponde à versão atual do CSV e aos parâmetros do pipeline
+def snapshot_valido(caminho, metadados_esperados):
+    metadados = ler_metadados_snapshot(caminho)
+    if metadados is None:
+        return False
+    return metadados == {**metadados_esperados, 'versao': VERSAO_SNAPSHOT}
+
+# Função para carregar o snapshot mapeado em memória
+def carregar_snapshot(caminho):
+    tabela = feather.read_table(caminho, memory_map=True)
+    return tabela.to_pandas(split_blocks=True)
+
+# Metadados que identificam a versão da base e os parâmetros usados para gerá-la
+def metadados_base(caminho_csv, year_list, colunas_para_arredondar, valores_indesejados):
+    return {
+        'assinatura': assinatura_arquivo(caminho_csv),
+        'year_list': list(year_list),
+        'colunas_para_arredondar': list(colunas_para_arredondar),
+        'valores_indesejados': list(valores_indesejados),
+    }
+
+# Função para executar o pipeline sobre o CSV e gravar o resultado como snapshot
+def gerar_snapshot(caminho_csv, year_list, colunas_para_arredondar, valores_indesejados, caminho=None):
+    caminho = caminho or caminho_snapshot(caminho_csv)
+    metadados = metadados_base(caminho_csv, year_list, colunas_para_arredondar, valores_indesejados)
+
+    df = ler_base_passos_magicos(caminho_csv, year_list)
+    df = pipeline_passos_magicos_fundido(df, list(year_list), list(colunas_para_arredondar), list(valores_indesejados))
+    df = tipar_base(df, colunas_para_arredondar)
+
+    try:
+        salvar_snapshot(df, caminho, metadados)
+    except OSError:
+        pass  # Diretório somente leitura: segue sem snapshot
+    return df
+
+# Função para carregar a base tratada, usando o snapshot e voltando ao CSV apenas se ele estiver desatualizado
+def carregar_base_com_snapshot(caminho_csv, year_list, colunas_para_arredondar, valores_indesejados, caminho=None):
+    caminho = caminho or caminho_snapshot(caminho_csv)
+    metadados = metadados_base(caminho_csv, year_list, colunas_para_arredondar, valores_indesejados)
+    if snapshot_valido(caminho, metadados):
+        df = carregar_snapshot(caminho)
+        # Snapshot com tipos ou valores fora do esquema é descartado e regerado a partir do CSV
+        if base_tipada(df, colunas_para_arredondar) and not problemas_schema(df, colunas_para_arredondar):
+            return df
+    return gerar_snapshot(caminho_csv, year_list, colunas_para_arredondar, valores_indesejados, caminho)
+
+# Função para remover o snapshot, forçando o reprocessamento a partir do CSV
+def remover_snapshot(caminho_csv):
+    try:
+        os.remove(caminho_snapshot(caminho_csv))
+    except FileNotFoundError:
+        pass
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Gera o snapshot colunar da base tratada')
+    parser.add_argument('caminho_csv', nargs='?', default='PEDE_PASSOS_DATASET_FIAP.csv')
+    parser.add_argument('--anos', nargs='+', default=['2020', '2021', '2022'])
+    args = parser.parse_args()
+
+    df = gerar_snapshot(args.caminho_csv, args.anos, COLUNAS_INDICADORES, VALORES_INDESEJADOS)
+    memoria = relatorio_memoria(df)
+    print(f'{caminho_snapshot(args.caminho_csv)}: {len(df)} linhas, {memoria["bytes"].sum() / 1024:.0f} KiB em memória')
+    print(memoria.to_string())
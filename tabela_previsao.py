@@ -0,0 +1,107 @@
+import numpy as np
+
+# Grade de entradas dos campos do app: indicadores de 0,0 a 10,0 com passo 0,1 (101 valores por feature)
+PASSO_GRADE = 0.1
+LIMITES_GRADE = (0.0, 10.0)
+PONTOS_POR_EIXO = int(round((LIMITES_GRADE[1] - LIMITES_GRADE[0]) / PASSO_GRADE)) + 1
+
+# Tolerância para considerar um valor sobre a grade (ex.: 7.3 digitado vira 7.300000000000001 em float)
+TOLERANCIA_GRADE = 1e-6
+
+# Valores da grade em um eixo
+def eixo_grade():
+    return np.round(LIMITES_GRADE[0] + np.arange(PONTOS_POR_EIXO) * PASSO_GRADE, 10)
+
+# Todas as combinações da grade para n features (uma linha por combinação, a última feature variando mais rápido)
+def grade_completa(n_features):
+    return np.stack(np.meshgrid(*[eixo_grade()] * n_features, indexing='ij'), axis=-1).reshape(-1, n_features)
+
+# Tabela com a previsão de um modelo para todas as combinações da grade (até 2 features: 101 x 101 = 10.201 entradas),
+# guardada como bits (1,3 KB). Valores fora da grade (ex.: 7.25 vindo de um CSV) são previstos pelo modelo.
+class TabelaPrevisao:
+    def __init__(self, preditor):
+        if len(preditor.features) > 2:
+            raise ValueError(f'Tabela de previsão suporta até 2 features, o modelo tem {len(preditor.features)}')
+        self.preditor = preditor
+        self.features = preditor.features
+        self.classes = preditor.classes
+        if len(self.classes) != 2:
+            raise ValueError('Tabela de previsão suporta apenas classificadores binários')
+
+        indices_classe = (preditor.prever(grade_completa(len(self.features))) == self.classes[1]).astype(np.uint8)
+        self.formato = (PONTOS_POR_EIXO,) * len(self.features)
+        self.bits = np.packbits(indices_classe)
+
+    # Matriz com o índice da classe (0 ou 1) em cada ponto da grade: linhas = 1ª feature, colunas = 2ª feature
+    def superficie(self):
+        return np.unpackbits(self.bits, count=int(np.prod(self.formato))).reshape(self.formato)
+
+    # Consulta de uma única linha em Python puro (o caminho vetorizado custa mais que a própria consulta)
+    def _prever_linha(self, valores):
+        posicao = 0
+        for valor in valores:
+            relativo = (valor - LIMITES_GRADE[0]) / PASSO_GRADE
+            indice = round(relativo)
+            if abs(relativo - indice) > TOLERANCIA_GRADE or not 0 <= indice < PONTOS_POR_EIXO:
+                return self.preditor.prever(valores)
+            posicao = posicao * PONTOS_POR_EIXO + indice
+        return self.classes[(self.bits[posicao >> 3] >> (7 - (posicao & 7))) & 1]
+
+    # Função de previsão: consulta a tabela para as linhas sobre a grade e o modelo para as demais
+    def prever(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            return self._prever_linha(X.tolist())
+        linhas = X
+        posicoes = (linhas - LIMITES_GRADE[0]) / PASSO_GRADE
+        indices = np.rint(posicoes)
+        na_grade = ((np.abs(posicoes - indices) <= TOLERANCIA_GRADE)
+                    & (indices >= 0) & (indices < PONTOS_POR_EIXO)).all(axis=1)
+
+        resultado = np.empty(len(linhas), dtype=self.classes.dtype)
+        if na_grade.any():
+            posicao_plana = np.ravel_multi_index(indices[na_grade].astype(np.intp).T, self.formato)
+            indices_classe = (self.bits[posicao_plana >> 3] >> (7 - (posicao_plana & 7))) & 1
+            resultado[na_grade] = self.classes[indices_classe]
+        if not na_grade.all():
+            resultado[~na_grade] = self.preditor.prever(linhas[~na_grade])
+        return resultado
+
+    # Interface do sklearn, para uso no lugar do modelo na previsão em lote (previsao_lote.py)
+    def predict(self, X):
+        return self.prever(X)
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from joblib import load
+
+    from modelos import CAMINHOS_MODELOS, obter_tabela
+
+    parser = argparse.ArgumentParser(description='Monta a tabela de previsão de um modelo e compara com o modelo do sklearn')
+    parser.add_argument('--modelo', default='bolsa')
+    parser.add_argument('--repeticoes', type=int, default=2_000)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    tabela = obter_tabela(args.modelo)
+    tempo_montagem = time.perf_counter() - inicio
+
+    # Conferência com o modelo do sklearn em toda a grade e em pontos fora dela
+    import pandas as pd
+
+    modelo = load(CAMINHOS_MODELOS[args.modelo])
+    grade = grade_completa(len(tabela.features))
+    fora_da_grade = np.random.default_rng(55).uniform(*LIMITES_GRADE, size=(10_000, len(tabela.features)))
+    for nome, X in [('grade', grade), ('fora da grade', fora_da_grade)]:
+        divergencias = int((tabela.prever(X) != modelo.predict(pd.DataFrame(X, columns=tabela.features))).sum())
+        print(f'{nome}: {len(X)} pontos, {divergencias} divergências em relação ao sklearn')
+
+    linha = np.full(len(tabela.features), 5.0)
+    inicio = time.perf_counter()
+    for _ in range(args.repeticoes):
+        tabela.prever(linha)
+    tempo_consulta = (time.perf_counter() - inicio) / args.repeticoes
+    print(f'tabela {tabela.formato} montada em {tempo_montagem * 1000:.1f} ms, {tabela.bits.nbytes} bytes; '
+          f'consulta de uma linha em {tempo_consulta * 1e6:.1f} µs')
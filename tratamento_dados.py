@@ -0,0 +1,290 @@
+import functools
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from perfilamento import informar_formato, medir_etapa
+
+# Padrão das colunas com sufixo de ano (ex.: INDE_2020)
+PADRAO_COLUNA_ANO = re.compile(r'^(?P<coluna>.+)_(?P<ano>\d{4})$')
+
+# Colunas restauradas após drop_null_columns (podem conter nulos)
+COLUNAS_RESTAURADAS = ['PONTO_VIRADA', 'INDICADO_BOLSA']
+
+# Parâmetros padrão do pipeline, compartilhados pelos demais módulos: indicadores arredondados (notas de 0 a 10)
+# e sentinelas da base PEDE descartadas na coluna PEDRA ('#NULO!' a partir de 2021, 'D9891/2A' em 2020)
+COLUNAS_INDICADORES = ['INDE', 'IAA', 'IEG', 'IPS', 'IDA', 'IPP', 'IPV', 'IAN']
+VALORES_INDESEJADOS = ['#NULO!', 'D9891/2A']
+
+# Execução do pipeline fundido com um pool por ano: quantidade de workers (1 = em série) e tipo do pool
+WORKERS_PIPELINE = int(os.environ.get('PASSOS_MAGICOS_WORKERS_PIPELINE', 1))
+MODO_PARALELO = os.environ.get('PASSOS_MAGICOS_MODO_PARALELO', 'processos')
+MODOS_PARALELOS = ('processos', 'threads')
+
+# Hash do conteúdo do arquivo, memoizado por (caminho, mtime, tamanho) para não reler o arquivo sem necessidade
+@functools.lru_cache(maxsize=16)
+def _hash_arquivo(caminho, mtime_ns, tamanho):
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+# Função para calcular a assinatura (hash do conteúdo) de um arquivo da base
+def assinatura_arquivo(caminho):
+    stat = os.stat(caminho)
+    return _hash_arquivo(os.path.abspath(caminho), stat.st_mtime_ns, stat.st_size)
+
+# Função para descobrir os anos presentes nos cabeçalhos da base
+def descobrir_anos(df):
+    anos = []
+    for col in df.columns:
+        match = PADRAO_COLUNA_ANO.match(col)
+        if match and match.group('ano') not in anos:
+            anos.append(match.group('ano'))
+    return sorted(anos)
+
+# Função para tratar as colunas de diferentes anos (versão vetorizada)
+@medir_etapa
+def tratativa_base_passos_magicos(df, year_list=None):
+    if year_list is None:
+        year_list = descobrir_anos(df)
+
+    blocos = []
+    for year in year_list:
+        # Filtra as colunas que terminam com o ano especificado
+        cols_with_year = [col for col in df.columns if col.endswith(f'_{year}')]
+
+        # Seleciona o bloco de colunas do ano inteiro de uma vez, sem percorrer linha a linha
+        bloco = df[cols_with_year].copy()
+        bloco.columns = [col[:-5] for col in cols_with_year]
+        bloco.insert(0, 'ANO', year)
+        bloco.insert(0, 'NOME', df['NOME'])
+        blocos.append(bloco)
+
+    if not blocos:
+        return pd.DataFrame()
+
+    # Um único concat para todos os anos
+    return pd.concat(blocos, ignore_index=True)
+
+# Implementação original (linha a linha), mantida como referência para o benchmark
+def tratativa_base_passos_magicos_legado(df, year_list):
+    combined_df = pd.DataFrame()
+
+    for year in year_list:
+        # Filtra as colunas que terminam com o ano especificado
+        cols_with_year = [col for col in df.columns if col.endswith(f'_{year}')]
+
+        # Cria novas colunas sem o ano
+        new_columns = ['NOME', 'ANO'] + [col[:-5] for col in cols_with_year]
+
+        # Cria um novo DataFrame temporário
+        temp_df = pd.DataFrame(columns=new_columns)
+
+        # Preenche o novo DataFrame com os dados correspondentes
+        for index, row in df.iterrows():
+            new_row = [row['NOME'], year] + [row[col] for col in cols_with_year]
+            temp_df.loc[index] = new_row
+
+        # Adiciona os dados processados ao DataFrame combinado
+        combined_df = pd.concat([combined_df, temp_df], ignore_index=True)
+
+    return combined_df
+
+# Função para tratar a coluna FASE_TURMA para o ano de 2020 (bases sem o layout de 2020 já trazem FASE e TURMA)
+@medir_etapa
+def tratar_fase_turma(df):
+    if 'FASE_TURMA' not in df.columns:
+        return df
+    df.loc[df['ANO'] == '2020', 'FASE'] = df['FASE_TURMA'].str[0]
+    df.loc[df['ANO'] == '2020', 'TURMA'] = df['FASE_TURMA'].str[1:]
+    return df
+
+# Função para limpar o dataset removendo linhas e colunas indesejadas
+@medir_etapa
+def cleaning_dataset(df):
+    _df = df.dropna(subset=df.columns.difference(['NOME', 'ANO']), how='all')  # Drop linhas com NaN em todas as colunas exceto 'NOME' e 'ANO'
+    _df = _df[~_df.isna().all(axis=1)]  # Remove linhas com apenas NaN
+    return _df
+
+# Função para manter apenas as colunas sem valores nulos
+@medir_etapa
+def drop_null_columns(df):
+    df = df.dropna(axis=1, how='any')  # Drop colunas com qualquer valor nulo
+    return df
+
+# Função para restaurar colunas específicas de outro DataFrame
+@medir_etapa
+def restore_columns(df, df_source, columns):
+    for col in columns:
+        df.loc[:, col] = df_source[col]
+    return df
+
+# Função para arredondar as colunas para 2 casas decimais
+@medir_etapa
+def round_columns(df, columns):
+    df[columns] = df[columns].apply(pd.to_numeric, errors='coerce')
+    df[columns] = df[columns].round(2)
+    return df
+
+# Função para filtrar valores indesejados em uma coluna específica
+@medir_etapa
+def filter_unwanted_values(df, column, unwanted_values):
+    df = df[~df[column].isin(unwanted_values)]
+    return df
+
+# Pipeline para executar todas as funções
+@medir_etapa
+def pipeline_passos_magicos(df, year_list, colunas_para_arredondar, valores_indesejados):
+    df_combined = tratativa_base_passos_magicos(df, year_list)
+    df_combined = tratar_fase_turma(df_combined)
+    df_cleaned = cleaning_dataset(df_combined)
+    df_cleaned = drop_null_columns(df_cleaned)
+
+    # Restaurar colunas
+    df_cleaned = restore_columns(df_cleaned, df_combined, COLUNAS_RESTAURADAS)
+
+    # Arredondar colunas numéricas
+    df_cleaned = round_columns(df_cleaned, colunas_para_arredondar)
+
+    # Filtrar valores indesejados na coluna 'PEDRA'
+    df_final = filter_unwanted_values(df_cleaned, 'PEDRA', valores_indesejados)
+
+    return df_final
+
+# Função para obter os valores de uma coluna (sem o ano) para um ano, direto da base wide (None se não existir)
+def _valores_ano(df, colunas_ano, year, col):
+    if col == 'NOME':
+        return df['NOME']
+    if year == '2020' and col in ('FASE', 'TURMA'):
+        # Equivalente a tratar_fase_turma
+        fase_turma = colunas_ano[year].get('FASE_TURMA')
+        if fase_turma is None:
+            return None
+        return df[fase_turma].str[0] if col == 'FASE' else df[fase_turma].str[1:]
+    coluna_original = colunas_ano[year].get(col)
+    return None if coluna_original is None else df[coluna_original]
+
+# Função para analisar um ano do pipeline fundido: linhas (aluno, ano) mantidas por cleaning_dataset e colunas
+# com algum nulo nessas linhas (as colunas sem nulos em todos os anos são mantidas por drop_null_columns)
+def _analisar_ano(df, colunas, year, candidatas):
+    colunas_ano = {year: colunas}
+    if not colunas:
+        return np.zeros(len(df), bool), set()
+    linhas = df[list(colunas.values())].notna().any(axis=1).to_numpy()
+    com_nulos = set()
+    if linhas.any():
+        for col in candidatas:
+            valores = _valores_ano(df, colunas_ano, year, col)
+            if valores is None or valores[linhas].isna().any():
+                com_nulos.add(col)
+    return linhas, com_nulos
+
+# Função para montar o bloco de um ano na base longa, apenas com as colunas finais
+def _montar_bloco_ano(df, colunas, year, posicao, linhas, colunas_finais, colunas_para_arredondar, valores_indesejados):
+    colunas_ano = {year: colunas}
+
+    # filter_unwanted_values aplicado junto com a seleção das linhas
+    pedra = _valores_ano(df, colunas_ano, year, 'PEDRA')
+    if pedra is not None:
+        linhas = linhas & ~pedra.isin(valores_indesejados).to_numpy()
+    posicoes = np.flatnonzero(linhas)
+
+    dados = {}
+    for col in colunas_finais:
+        if col == 'ANO':
+            dados[col] = np.full(len(posicoes), year, dtype=object)
+            continue
+        valores = _valores_ano(df, colunas_ano, year, col)
+        if valores is None:
+            continue  # Preenchida com NaN no concat, como na base longa
+        valores = valores.iloc[posicoes]
+        if col in colunas_para_arredondar:
+            # round_columns
+            valores = pd.to_numeric(valores, errors='coerce').round(2)
+        dados[col] = valores.to_numpy()
+    return pd.DataFrame(dados, index=posicao * len(df) + posicoes)
+
+# Função para executar uma função por ano, em série ou em um pool de processos/threads.
+# O resultado sai na ordem de year_list independentemente da ordem em que os anos terminam.
+def _executar_por_ano(func, argumentos, workers, modo):
+    if workers <= 1 or len(argumentos) <= 1:
+        return [func(*args) for args in argumentos]
+    if modo not in MODOS_PARALELOS:
+        raise ValueError(f'Modo paralelo inválido: {modo} (use {" ou ".join(MODOS_PARALELOS)})')
+    Executor = ProcessPoolExecutor if modo == 'processos' else ThreadPoolExecutor
+    with Executor(max_workers=min(workers, len(argumentos))) as executor:
+        return list(executor.map(func, *zip(*argumentos)))
+
+# Fase do pipeline fundido equivalente a cleaning_dataset, drop_null_columns e restore_columns: analisa cada ano
+# (em paralelo com workers > 1) e decide as linhas (aluno, ano) mantidas e as colunas finais da base longa
+@medir_etapa
+def selecionar_linhas_colunas(df, year_list, colunas_ano, dados_ano, ordem, colunas_para_arredondar, workers, modo):
+    # cleaning_dataset e drop_null_columns: linhas mantidas e colunas com nulos de cada ano
+    candidatas = [col for col in ordem if col != 'ANO']
+    analises = _executar_por_ano(
+        _analisar_ano, [(dados_ano[year], colunas_ano[year], year, candidatas) for year in year_list], workers, modo)
+    linhas_mantidas = {year: linhas for year, (linhas, _) in zip(year_list, analises)}
+    com_nulos = [nulos for linhas, nulos in analises if linhas.any()]
+
+    # drop_null_columns: mantém as colunas sem nulos nas linhas mantidas de todos os anos
+    colunas_finais = [col for col in ordem if col == 'ANO' or not any(col in nulos for nulos in com_nulos)]
+    # restore_columns: colunas removidas voltam no final, com os nulos
+    colunas_finais += [col for col in COLUNAS_RESTAURADAS if col not in colunas_finais]
+    for col in COLUNAS_RESTAURADAS + list(colunas_para_arredondar) + ['PEDRA']:
+        if col not in colunas_finais:
+            raise KeyError(col)
+
+    # Entrada: base wide; saída: linhas (aluno, ano) mantidas x colunas finais
+    informar_formato(saida=(sum(int(linhas.sum()) for linhas in linhas_mantidas.values()), len(colunas_finais)))
+    return linhas_mantidas, colunas_finais
+
+# Fase do pipeline fundido equivalente a round_columns e filter_unwanted_values: monta o bloco de cada ano
+# (em paralelo com workers > 1) apenas com as linhas e colunas finais
+@medir_etapa
+def montar_blocos_anos(df, year_list, colunas_ano, dados_ano, linhas_mantidas, colunas_finais,
+                       colunas_para_arredondar, valores_indesejados, workers, modo):
+    blocos = _executar_por_ano(
+        _montar_bloco_ano,
+        [(dados_ano[year], colunas_ano[year], year, posicao, linhas_mantidas[year], colunas_finais,
+          list(colunas_para_arredondar), list(valores_indesejados)) for posicao, year in enumerate(year_list)],
+        workers, modo)
+    informar_formato(saida=(sum(len(bloco) for bloco in blocos), len(colunas_finais)))
+    return blocos
+
+# Fase final do pipeline fundido: concatena os blocos dos anos na ordem de year_list
+@medir_etapa
+def concatenar_blocos(blocos, colunas_finais):
+    informar_formato(entrada=(sum(len(bloco) for bloco in blocos), len(colunas_finais)))
+    return pd.concat(blocos)[colunas_finais]
+
+# Pipeline fundido: mesmo resultado de pipeline_passos_magicos, decidindo linhas e colunas sobre a base wide
+# e materializando apenas o que sobra, sem as cópias intermediárias da base longa.
+# Com workers > 1, os grupos de colunas de cada ano são processados em paralelo e concatenados uma única vez,
+# na ordem de year_list (resultado idêntico ao da execução em série).
+@medir_etapa
+def pipeline_passos_magicos_fundido(df, year_list, colunas_para_arredondar, valores_indesejados,
+                                    workers=WORKERS_PIPELINE, modo=MODO_PARALELO):
+    # Colunas de cada ano e ordem das colunas na base longa
+    colunas_ano, ordem = {}, ['NOME', 'ANO']
+    for year in year_list:
+        colunas_ano[year] = {col[:-5]: col for col in df.columns if col.endswith(f'_{year}')}
+        ordem += [col for col in colunas_ano[year] if col not in ordem]
+    ordem += [col for col in ('FASE', 'TURMA') if col not in ordem]
+
+    # Em processos, cada worker recebe apenas o grupo de colunas do seu ano; em threads (ou em série), a própria base
+    if workers > 1 and modo == 'processos':
+        dados_ano = {year: df[['NOME'] + list(colunas_ano[year].values())] for year in year_list}
+    else:
+        dados_ano = {year: df for year in year_list}
+
+    linhas_mantidas, colunas_finais = selecionar_linhas_colunas(
+        df, year_list, colunas_ano, dados_ano, ordem, colunas_para_arredondar, workers, modo)
+    blocos = montar_blocos_anos(df, year_list, colunas_ano, dados_ano, linhas_mantidas, colunas_finais,
+                                colunas_para_arredondar, valores_indesejados, workers, modo)
+    return concatenar_blocos(blocos, colunas_finais)
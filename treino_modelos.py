@@ -0,0 +1,160 @@
+import itertools
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from imblearn.over_sampling import SMOTE
+from joblib import Memory, Parallel, delayed, dump, hash as hash_joblib
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, precision_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.svm import SVC
+
+from modelos import CAMINHO_RELATORIO, CAMINHOS_MODELOS, FEATURES_MODELOS, caminho_preditor, salvar_relatorio
+from preditor_numpy import exportar_arquivo
+
+# Semente usada nos modelos salvos (SVC(random_state=55))
+SEMENTE = 55
+
+# Cache em disco dos resultados de cada fold (chave: dados, modelo, parâmetros e índices do fold)
+DIRETORIO_CACHE = '.cache_treino'
+
+# Variável alvo de cada tarefa
+ALVOS = {
+    'ponto_virada': 'PONTO_VIRADA',
+    'bolsa': 'INDICADO_BOLSA',
+}
+
+# Modelos candidatos e a grade de hiperparâmetros de cada um
+CANDIDATOS = {
+    'KNN': (KNeighborsClassifier(), {'n_neighbors': [2, 3, 5, 7, 9]}),
+    'Random Forest': (RandomForestClassifier(random_state=SEMENTE),
+                      {'n_estimators': [100, 200], 'max_depth': [None, 5, 10]}),
+    'SVM': (SVC(kernel='linear', random_state=SEMENTE), {'C': [0.1, 1, 10]}),
+}
+
+# Função para separar features e alvo (Sim = 1, Não = 0) de uma tarefa
+def preparar_dados(df, tarefa):
+    alvo = df[ALVOS[tarefa]].map({'Sim': 1, 'Não': 0})
+    validas = alvo.notna() & df[FEATURES_MODELOS[tarefa]].notna().all(axis=1)
+    X = df.loc[validas, FEATURES_MODELOS[tarefa]].astype('float64')
+    y = alvo[validas].astype(int).to_numpy()
+    return X, y
+
+# Função para expandir a grade de hiperparâmetros em uma lista de combinações
+def combinacoes(grade):
+    chaves = sorted(grade)
+    return [dict(zip(chaves, valores)) for valores in itertools.product(*(grade[chave] for chave in chaves))]
+
+# Função para treinar um modelo com as classes balanceadas por SMOTE (como no notebook de análise)
+def treinar(estimador, parametros, X, y):
+    X_balanceado, y_balanceado = SMOTE(random_state=SEMENTE).fit_resample(X, y)
+    return clone(estimador).set_params(**parametros).fit(X_balanceado, y_balanceado)
+
+# Função para calcular as métricas reportadas na página (precisão ponderada, como no notebook)
+def metricas(y_real, previsto):
+    return {
+        'acuracia': float(accuracy_score(y_real, previsto)),
+        'precisao': float(precision_score(y_real, previsto, average='weighted', zero_division=0)),
+    }
+
+# Função para treinar e avaliar um fold (executada nos processos do pool)
+def _avaliar_fold(estimador, parametros, X, y, treino, teste):
+    inicio = time.perf_counter()
+    modelo = treinar(estimador, parametros, X.iloc[treino], y[treino])
+    resultado = metricas(y[teste], modelo.predict(X.iloc[teste]))
+    resultado['tempo_s'] = time.perf_counter() - inicio
+    return resultado
+
+# Função para avaliar um candidato: validação cruzada da grade inteira em paralelo e teste no holdout
+def avaliar_candidato(estimador, grade, X_treino, y_treino, X_teste, y_teste, n_folds, n_jobs, memoria):
+    avaliar_fold = memoria.cache(_avaliar_fold)
+    folds = list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=SEMENTE).split(X_treino, y_treino))
+    grade_expandida = combinacoes(grade)
+
+    inicio = time.perf_counter()
+    resultados = Parallel(n_jobs=n_jobs)(
+        delayed(avaliar_fold)(estimador, parametros, X_treino, y_treino, treino, teste)
+        for parametros in grade_expandida for treino, teste in folds
+    )
+
+    # Escolhe a combinação com maior acurácia média entre os folds
+    por_combinacao = [resultados[i * n_folds:(i + 1) * n_folds] for i in range(len(grade_expandida))]
+    medias = [np.mean([fold['acuracia'] for fold in folds_combinacao]) for folds_combinacao in por_combinacao]
+    melhor = int(np.argmax(medias))
+    acuracias_cv = [fold['acuracia'] for fold in por_combinacao[melhor]]
+
+    modelo = treinar(estimador, grade_expandida[melhor], X_treino, y_treino)
+    resultado_teste = metricas(y_teste, modelo.predict(X_teste))
+    return modelo, {
+        'melhores_parametros': grade_expandida[melhor],
+        'cv_acuracia_media': float(np.mean(acuracias_cv)),
+        'cv_acuracia_desvio': float(np.std(acuracias_cv)),
+        'acuracia_teste': resultado_teste['acuracia'],
+        'precisao_teste': resultado_teste['precisao'],
+        'combinacoes_avaliadas': len(grade_expandida),
+        'tempo_s': time.perf_counter() - inicio,
+    }
+
+# Função para treinar e avaliar todos os candidatos de todas as tarefas
+def treinar_e_avaliar(df, n_folds=5, n_jobs=-1, diretorio_cache=DIRETORIO_CACHE, tamanho_teste=0.2):
+    memoria = Memory(diretorio_cache, verbose=0)
+    relatorio = {
+        'gerado_em': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'n_folds': n_folds,
+        'n_jobs': os.cpu_count() if n_jobs == -1 else n_jobs,
+        'tarefas': {},
+    }
+    modelos_svm = {}
+
+    for tarefa in ALVOS:
+        X, y = preparar_dados(df, tarefa)
+        X_treino, X_teste, y_treino, y_teste = train_test_split(
+            X, y, test_size=tamanho_teste, stratify=y, random_state=SEMENTE)
+
+        resultado_tarefa = {'linhas': len(X), 'hash_dados': hash_joblib((X, y)), 'modelos': {}}
+        for nome, (estimador, grade) in CANDIDATOS.items():
+            modelo, resultado = avaliar_candidato(estimador, grade, X_treino, y_treino, X_teste, y_teste,
+                                                  n_folds, n_jobs, memoria)
+            resultado_tarefa['modelos'][nome] = resultado
+            if nome == 'SVM':
+                modelos_svm[tarefa] = modelo
+        relatorio['tarefas'][tarefa] = resultado_tarefa
+
+    return relatorio, modelos_svm
+
+if __name__ == '__main__':
+    import argparse
+
+    from leitura_dados import ler_base_passos_magicos
+    from snapshot_dados import COLUNAS_INDICADORES, VALORES_INDESEJADOS
+    from tratamento_dados import pipeline_passos_magicos
+
+    parser = argparse.ArgumentParser(description='Treino e avaliação dos modelos candidatos (KNN, Random Forest e SVM)')
+    parser.add_argument('caminho_csv', nargs='?', default='PEDE_PASSOS_DATASET_FIAP.csv')
+    parser.add_argument('--anos', nargs='+', default=['2020', '2021', '2022'])
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--relatorio', default=CAMINHO_RELATORIO)
+    parser.add_argument('--exportar', action='store_true', help='Sobrescreve os artefatos .joblib (e os .npz) com os SVMs treinados')
+    args = parser.parse_args()
+
+    df = pipeline_passos_magicos(ler_base_passos_magicos(args.caminho_csv, args.anos), args.anos,
+                                 COLUNAS_INDICADORES, VALORES_INDESEJADOS)
+    relatorio, modelos_svm = treinar_e_avaliar(df, n_folds=args.folds, n_jobs=args.n_jobs)
+    salvar_relatorio(relatorio, args.relatorio)
+
+    for tarefa, resultado_tarefa in relatorio['tarefas'].items():
+        print(f"{tarefa} ({resultado_tarefa['linhas']} linhas)")
+        for nome, resultado in resultado_tarefa['modelos'].items():
+            print(f"  {nome:>13}: acurácia {resultado['acuracia_teste']:.2%}, precisão {resultado['precisao_teste']:.2%}, "
+                  f"CV {resultado['cv_acuracia_media']:.2%} ± {resultado['cv_acuracia_desvio']:.2%}, "
+                  f"{resultado['tempo_s']:.1f} s")
+
+    if args.exportar:
+        for tarefa, modelo in modelos_svm.items():
+            dump(modelo, CAMINHOS_MODELOS[tarefa])
+            exportar_arquivo(CAMINHOS_MODELOS[tarefa], FEATURES_MODELOS[tarefa], caminho_preditor(tarefa))
@@ -0,0 +1,185 @@
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Registro das unidades atendidas pelo painel: cada unidade tem a sua base no formato PEDE e os seus modelos.
+# Um único processo do Streamlit atende todas as unidades; bases e modelos ficam nos caches LRU de
+# cache_dados.py e modelos.py, com orçamento de memória compartilhado entre as unidades.
+CAMINHO_UNIDADES = os.environ.get('PASSOS_MAGICOS_UNIDADES', 'unidades.json')
+
+# Contagem de acessos por unidade (usada para escolher as unidades pré-aquecidas na inicialização)
+CAMINHO_USO = os.environ.get('PASSOS_MAGICOS_USO_UNIDADES', '.uso_unidades.json')
+
+# Quantidade de unidades pré-aquecidas na inicialização (desativado por padrão: o pré-aquecimento importa pandas
+# e pyarrow no processo, que a página "Deploy do Modelo" sozinha não carrega) e de threads usadas para isso
+UNIDADES_PREAQUECIDAS = int(os.environ.get('PASSOS_MAGICOS_PREAQUECER', 0))
+THREADS_PREAQUECIMENTO = int(os.environ.get('PASSOS_MAGICOS_THREADS_PREAQUECIMENTO', 2))
+
+# Unidade usada quando não há registro (a base e os modelos deste repositório)
+UNIDADE_PADRAO = {
+    'nome': 'Passos Mágicos',
+    'caminho_csv': 'PEDE_PASSOS_DATASET_FIAP.csv',
+    'anos': ['2020', '2021', '2022'],
+    'modelos': {
+        'ponto_virada': 'modelo_svm_pv.joblib',
+        'bolsa': 'modelo_svm_b.joblib',
+    },
+}
+
+_lock = threading.Lock()
+_executor = None
+_falhas = {}
+_logger = logging.getLogger(__name__)
+
+# Função para ler o registro de unidades (lista com a unidade padrão se o arquivo não existir)
+def listar_unidades(caminho=CAMINHO_UNIDADES):
+    if not os.path.exists(caminho):
+        return [UNIDADE_PADRAO]
+    with open(caminho, encoding='utf-8') as arquivo:
+        unidades = json.load(arquivo)['unidades']
+    for unidade in unidades:
+        # Base no formato PEDE (caminho_csv e anos) ou base incremental (diretorio_base, com os anos do manifesto)
+        faltando = {'nome'} | ({'caminho_csv', 'anos'} if 'diretorio_base' not in unidade else set())
+        faltando -= set(unidade)
+        if faltando:
+            raise ValueError(f"Unidade {unidade.get('nome', '?')} sem os campos: {', '.join(sorted(faltando))}")
+        unidade.setdefault('modelos', UNIDADE_PADRAO['modelos'])
+    return unidades
+
+# Função para obter uma unidade do registro pelo nome
+def obter_unidade(nome, caminho=CAMINHO_UNIDADES):
+    for unidade in listar_unidades(caminho):
+        if unidade['nome'] == nome:
+            return unidade
+    raise KeyError(f'Unidade não encontrada: {nome}')
+
+# Função para obter a base da unidade para cache_dados.py: (diretório, None) para uma base incremental, cujos anos
+# são os ingeridos no manifesto, ou (CSV, anos) para uma base no formato PEDE
+def fonte_base(unidade):
+    if 'diretorio_base' in unidade:
+        return unidade['diretorio_base'], None
+    return unidade['caminho_csv'], unidade['anos']
+
+# Função para obter os nomes (no registro de modelos.py) dos modelos da unidade, por tarefa.
+# Modelos iguais aos do repositório mantêm o nome da tarefa; os demais são registrados como "unidade/tarefa".
+def nomes_modelos(unidade):
+    from modelos import CAMINHOS_MODELOS, FEATURES_MODELOS, registrar_modelo
+
+    nomes = {}
+    for tarefa, caminho in unidade['modelos'].items():
+        if caminho == UNIDADE_PADRAO['modelos'].get(tarefa) and CAMINHOS_MODELOS.get(tarefa) == caminho:
+            nomes[tarefa] = tarefa
+            continue
+        nome = f"{unidade['nome']}/{tarefa}"
+        if CAMINHOS_MODELOS.get(nome) != caminho:
+            registrar_modelo(nome, caminho, FEATURES_MODELOS[tarefa])
+        nomes[tarefa] = nome
+    return nomes
+
+# Função para ler a contagem de acessos por unidade
+def ler_uso(caminho=CAMINHO_USO):
+    if not os.path.exists(caminho):
+        return {}
+    try:
+        with open(caminho, encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+
+# Função para registrar um acesso à unidade (arquivo gravado por substituição, para não corromper com acessos simultâneos)
+def registrar_uso(nome, caminho=CAMINHO_USO):
+    with _lock:
+        uso = ler_uso(caminho)
+        uso[nome] = uso.get(nome, 0) + 1
+        temporario = f'{caminho}.{os.getpid()}.tmp'
+        try:
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                json.dump(uso, arquivo, ensure_ascii=False)
+            os.replace(temporario, caminho)
+        except OSError:
+            pass  # Diretório somente leitura: segue sem contar o acesso
+
+# Função para listar as n unidades mais acessadas (as do registro que nunca foram acessadas vêm depois, na ordem do registro)
+def unidades_mais_usadas(n, caminho_uso=CAMINHO_USO, caminho_unidades=CAMINHO_UNIDADES):
+    uso = ler_uso(caminho_uso)
+    unidades = listar_unidades(caminho_unidades)
+    return sorted(unidades, key=lambda unidade: -uso.get(unidade['nome'], 0))[:n]
+
+# Função para carregar nos caches a base, as agregações, o índice e os modelos de uma unidade
+def preaquecer_unidade(unidade):
+    from cache_dados import carregar_agregacoes, carregar_indice_alunos
+    from modelos import FEATURES_MODELOS, obter_preditor, obter_tabela
+    from snapshot_dados import COLUNAS_INDICADORES, VALORES_INDESEJADOS
+
+    caminho, anos = fonte_base(unidade)
+    carregar_agregacoes(caminho, anos, COLUNAS_INDICADORES, VALORES_INDESEJADOS)
+    carregar_indice_alunos(caminho, anos, COLUNAS_INDICADORES, VALORES_INDESEJADOS)
+    for nome in nomes_modelos(unidade).values():
+        obter_tabela(nome) if len(FEATURES_MODELOS[nome]) <= 2 else obter_preditor(nome)
+    return unidade['nome']
+
+# Função para guardar (e registrar no log) a falha do pré-aquecimento de uma unidade
+def _acompanhar_preaquecimento(nome, tarefa):
+    erro = tarefa.exception()
+    with _lock:
+        if erro is None:
+            _falhas.pop(nome, None)
+            return
+        _falhas[nome] = f'{type(erro).__name__}: {erro}'
+    _logger.warning('Falha ao pré-aquecer a unidade %s', nome, exc_info=erro)
+
+# Função para listar as unidades cujo pré-aquecimento falhou neste processo, com o erro de cada uma
+def falhas_preaquecimento():
+    with _lock:
+        return dict(_falhas)
+
+# Função para pré-aquecer em segundo plano as unidades mais acessadas (uma única vez por processo).
+# Usa threads: os caches são do processo, e um pool de processos teria de copiar as bases de volta.
+# O app chama esta função ao final do script, depois de renderizar a página.
+def iniciar_preaquecimento(n=UNIDADES_PREAQUECIDAS, threads=THREADS_PREAQUECIMENTO):
+    global _executor
+    with _lock:
+        if _executor is not None or n <= 0:
+            return []
+        # Os módulos (pandas, pyarrow) são importados aqui: importá-los ao mesmo tempo nas threads e no script
+        # do Streamlit pode expor módulos parcialmente inicializados
+        import cache_dados
+        import modelos
+
+        _executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='preaquecimento')
+    tarefas = []
+    for unidade in unidades_mais_usadas(n):
+        tarefa = _executor.submit(preaquecer_unidade, unidade)
+        tarefa.add_done_callback(lambda tarefa, nome=unidade['nome']: _acompanhar_preaquecimento(nome, tarefa))
+        tarefas.append(tarefa)
+    return tarefas
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Lista as unidades registradas e pré-aquece as mais acessadas')
+    parser.add_argument('--preaquecer', type=int, default=max(UNIDADES_PREAQUECIDAS, 2))
+    args = parser.parse_args()
+
+    uso = ler_uso()
+    for unidade in listar_unidades():
+        caminho, anos = fonte_base(unidade)
+        print(f"{unidade['nome']}: {caminho} ({', '.join(anos) if anos else 'base incremental'}), "
+              f"{uso.get(unidade['nome'], 0)} acessos")
+
+    inicio = time.perf_counter()
+    for tarefa in iniciar_preaquecimento(args.preaquecer):
+        erro = tarefa.exception()
+        if erro is None:
+            print(f'{tarefa.result()} pré-aquecida em {time.perf_counter() - inicio:.2f} s')
+        else:
+            print(f'falha no pré-aquecimento: {type(erro).__name__}: {erro}')
+
+    from cache_dados import info_cache
+
+    _, estatisticas = info_cache()
+    print(f"cache de dados: {estatisticas['entradas']} entradas, {estatisticas['memoria_mb']:.1f} MiB "
+          f"de {estatisticas['orcamento_mb']:.0f} MiB, {estatisticas['descartes']} descartes")